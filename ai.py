@@ -5,16 +5,16 @@ def generate_study_plan(plan_type, inputs):
     """
     Generate a study plan based on the plan type and user inputs.
     In a real application, this would use an AI model to create personalized plans.
+    
+    plan_type is any registered planner name ("quick_study", "exam_time",
+    "submissions"); inputs is a dict validated against that planner's schema.
     """
-    # This is a placeholder function that would be replaced with actual AI implementation
-    if plan_type == "quick_study":
-        return generate_quick_study_plan(inputs) # type: ignore
-    elif plan_type == "exam_time":
-        return generate_exam_time_plan(inputs) # type: ignore
-    elif plan_type == "submissions":
-        return generate_submissions_plan(inputs) # type: ignore
-    else:
+    # Imported here because the planners use the helpers below
+    from planners import generate_plan, get_planner
+    
+    if get_planner(plan_type) is None:
         return {"error": "Invalid plan type"}
+    return generate_plan(plan_type, inputs)
 
 def generate_study_technique(learning_style):
     """
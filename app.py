@@ -1,14 +1,25 @@
 import streamlit as st
-import pandas as pd
 import datetime
-import json
 import os
 import random
+import time
 from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.graph_objects as go
-from ai import generate_study_plan, generate_resource_recommendations, generate_study_technique
-from database import Database
+from profiling import profile
+
+# Time every import from here on, including the pages' lazy ones, when
+# profiling is switched on; otherwise imports run without the extra finder
+if os.environ.get("STUDY_PLANNER_PROFILE"):
+    profile.install()
+
+from calendar_view import (AGENDA_LIMIT, agenda_entries, get_month_calendar, render_agenda, render_week,
+                           week_entries, week_start)
+from database import get_shared_database
+from models import minutes_to_time
+from intervals import BusyIndex
+from planners import generate_plan, replan
+from planners.quick_study import MAX_DAYS as QUICK_STUDY_MAX_DAYS
+from special_events import parse_special_events
+from task_view import PAGE_SIZES, STATUSES, filter_tasks, group_by_day, page_count, page_slice, task_days, task_subjects
 
 # Set page configuration
 st.set_page_config(
@@ -62,9 +73,9 @@ def load_css():
 
 load_css()
 
-# Initialize database
+# Initialize database: every session references the one process-wide store
 if 'db' not in st.session_state:
-    st.session_state.db = Database()
+    st.session_state.db = get_shared_database(os.environ.get("STUDY_PLANNER_DB", "study_planner.json"))
 
 # Initialize session state
 if 'current_plan' not in st.session_state:
@@ -93,13 +104,25 @@ def get_productivity_tip():
     ]
     return random.choice(tips)
 
+# Queued checkbox changes are saved once this many pile up, or once the
+# oldest has waited this long, if the user has not pressed Save before.
+# They are also saved before leaving the plan (Back, the navigation menu,
+# Reschedule). Each tick still reruns the script, as any Streamlit widget
+# change does; the queue only saves the store write and fsync per tick.
+# Ticks queued when the browser session ends are lost, at most
+# AUTOSAVE_CHANGES - 1 of them or AUTOSAVE_SECONDS' worth.
+AUTOSAVE_CHANGES = 10
+AUTOSAVE_SECONDS = 30
+
 # Main application
 def main():
     st.sidebar.title("AI Study Planner 📚")
     
-    # Main navigation
+    # Main navigation; leaving a page saves the task ticks queued on it
     page = st.sidebar.selectbox("Navigation", 
-                               ["Create Plan", "View Plans", "Calendar", "Insights"])
+                               ["Create Plan", "View Plans", "Calendar", "Insights"],
+                               on_change=save_all_progress)
+    autosave_progress()
     
     # Display motivational content in sidebar
     st.sidebar.markdown("---")
@@ -109,14 +132,20 @@ def main():
     st.sidebar.success(get_productivity_tip())
     
     # Page routing
-    if page == "Create Plan":
-        create_plan_page()
-    elif page == "View Plans":
-        view_plans_page()
-    elif page == "Calendar":
-        calendar_page()
-    elif page == "Insights":
-        insights_page()
+    with profile.page(page):
+        if page == "Create Plan":
+            create_plan_page()
+        elif page == "View Plans":
+            view_plans_page()
+        elif page == "Calendar":
+            calendar_page()
+        elif page == "Insights":
+            insights_page()
+    
+    # Cold start, import and page render times, when profiling is switched on
+    if os.environ.get("STUDY_PLANNER_PROFILE"):
+        with st.sidebar.expander("Startup Profile"):
+            st.text(profile.report())
 
 def create_plan_page():
     st.title("Create Your Study Plan")
@@ -134,15 +163,21 @@ def create_plan_page():
         exam_time_form()
     elif plan_type == "Submissions":
         submissions_form()
+    
+    # Display the new plan below the form, where its filters and pager rerun the page
+    plan = st.session_state.current_plan
+    if plan is not None and plan['type'] == plan_type:
+        display_plan(plan, show_progress=False, editable=False)
 
 def quick_study_form():
     st.subheader("Quick Study Plan")
-    st.write("Create a daily study plan to complete topics within 2 days")
+    st.write("Create a daily study plan to complete topics within a few days")
     
     with st.form("quick_study_form"):
         # Basic inputs
         subjects = st.text_area("Enter subjects (one per line)")
         topics_per_subject = st.text_area("Enter topics for each subject (format: Subject: Topic1, Topic2)")
+        study_days = st.number_input("Days to study", min_value=1, max_value=14, value=2)
         
         # Customization tab
         with st.expander("Customizations"):
@@ -189,9 +224,31 @@ def quick_study_form():
                         topics_dict[subj.strip()] = [t.strip() for t in topics.split(',')]
                 
                 # Generate plan using AI
-                plan = generate_quick_study_plan(subject_list, topics_dict, start_time, end_time, 
-                                               break_duration, break_frequency, preferred_activities,
-                                               special_events, learning_style, priority_settings)
+                today = datetime.now().date()
+                busy = BusyIndex.from_database(st.session_state.db, today, today + timedelta(days=QUICK_STUDY_MAX_DAYS))
+                plan = generate_plan('quick_study', {
+                    'subjects': subject_list, 'topics': topics_dict,
+                    'start_time': start_time, 'end_time': end_time,
+                    'break_duration': break_duration, 'break_frequency': break_frequency,
+                    'preferred_activities': preferred_activities, 'special_events': special_events,
+                    'learning_style': learning_style, 'priority_settings': priority_settings,
+                    'days': study_days, 'busy': busy
+                })
+                
+                # Report whether the topics fit in the chosen days
+                if plan['minutes_needed'] > plan['minutes_available']:
+                    study_dates = sorted({task['date'] for task in plan['tasks'] if 'date' in task})
+                    st.warning(
+                        f"Your topics need {plan['minutes_needed']} minutes of study and breaks, but only "
+                        f"{plan['minutes_available']} minutes are free in the next {study_days} day(s). "
+                        f"The plan continues until {study_dates[-1] if study_dates else 'later'}."
+                    )
+                if plan.get('minutes_unscheduled'):
+                    st.error(f"{plan['minutes_unscheduled']} minutes of study could not be scheduled.")
+                
+                # Report special events that could not be understood
+                for error in parse_special_events(special_events)[1]:
+                    st.warning(f"Ignored special event. {error}")
                 
                 # Save the plan
                 st.session_state.current_plan = plan
@@ -206,9 +263,6 @@ def quick_study_form():
                 
                 # Show success message
                 st.success("Your study plan has been generated!")
-                
-                # Display the plan
-                display_plan(plan, show_progress=False)
 
 def exam_time_form():
     st.subheader("Exam Time Plan")
@@ -238,7 +292,7 @@ def exam_time_form():
                     "Preferred study time",
                     ["Morning", "Afternoon", "Evening", "Night"]
                 )
-                special_events = st.text_area("Any special events to consider? (format: Event, Date)")
+                special_events = st.text_area("Any special events to consider? (format: Event, Date, Duration)")
             
             learning_style = st.radio("Your learning style", ["Visual", "Reading", "Mixed"], horizontal=True)
         
@@ -271,9 +325,17 @@ def exam_time_form():
                                 pass
                 
                 # Generate plan using AI
-                plan = generate_exam_time_plan(subject_list, exam_date, daily_hours, 
-                                             difficulty_dict, preferred_time, special_events,
-                                             learning_style, priority_settings)
+                busy = BusyIndex.from_database(st.session_state.db, datetime.now().date(), exam_date)
+                plan = generate_plan('exam_time', {
+                    'subjects': subject_list, 'exam_date': exam_date, 'daily_hours': daily_hours,
+                    'difficulty_dict': difficulty_dict, 'preferred_time': preferred_time,
+                    'special_events': special_events, 'learning_style': learning_style,
+                    'priority_settings': priority_settings, 'busy': busy
+                })
+                
+                # Report special events that could not be understood
+                for error in parse_special_events(special_events)[1]:
+                    st.warning(f"Ignored special event. {error}")
                 
                 # Save the plan
                 st.session_state.current_plan = plan
@@ -288,9 +350,6 @@ def exam_time_form():
                 
                 # Show success message
                 st.success("Your exam preparation plan has been generated!")
-                
-                # Display the plan
-                display_plan(plan, show_progress=False)
 
 def submissions_form():
     st.subheader("Submissions Plan")
@@ -318,7 +377,7 @@ def submissions_form():
                     "Preferred work time",
                     ["Morning", "Afternoon", "Evening", "Night"]
                 )
-                special_events = st.text_area("Any special events to consider? (format: Event, Date)")
+                special_events = st.text_area("Any special events to consider? (format: Event, Date, Duration)")
             
             work_style = st.radio("Your work style", ["Focused Sessions", "Spread Out", "Deadline Driven"], horizontal=True)
         
@@ -361,9 +420,18 @@ def submissions_form():
                                 pass
                 
                 # Generate plan using AI
-                plan = generate_submissions_plan(assignment_list, due_date_dict, daily_hours, 
-                                               complexity_dict, preferred_time, special_events,
-                                               work_style, priority_settings)
+                last_due = max(due_date_dict.values(), default=datetime.now().date() + timedelta(days=7))
+                busy = BusyIndex.from_database(st.session_state.db, datetime.now().date(), last_due)
+                plan = generate_plan('submissions', {
+                    'assignments': assignment_list, 'due_date_dict': due_date_dict, 'daily_hours': daily_hours,
+                    'complexity_dict': complexity_dict, 'preferred_time': preferred_time,
+                    'special_events': special_events, 'work_style': work_style,
+                    'priority_settings': priority_settings, 'busy': busy
+                })
+                
+                # Report special events that could not be understood
+                for error in parse_special_events(special_events)[1]:
+                    st.warning(f"Ignored special event. {error}")
                 
                 # Save the plan
                 st.session_state.current_plan = plan
@@ -378,15 +446,64 @@ def submissions_form():
                 
                 # Show success message
                 st.success("Your submissions plan has been generated!")
-                
-                # Display the plan
-                display_plan(plan, show_progress=False)
 
-def display_plan(plan, show_progress=True):
+def stage_task(plan_id, i, stored):
+    """Checkbox callback: queue a task's new state until the progress is saved"""
+    checked = st.session_state[f"task_{plan_id}_{i}"]
+    pending = st.session_state.setdefault(f"pending_{plan_id}", {})
+    if checked == stored:
+        pending.pop(i, None)
+    else:
+        pending[i] = checked
+    if pending:
+        st.session_state.setdefault(f"pending_since_{plan_id}", time.time())
+    else:
+        st.session_state.pop(f"pending_since_{plan_id}", None)
+
+def save_progress(plan_id):
+    """Commit the queued task changes of a plan as one atomic progress delta"""
+    changes = st.session_state.pop(f"pending_{plan_id}", {})
+    st.session_state.pop(f"pending_since_{plan_id}", None)
+    if changes:
+        st.session_state.db.set_completed(plan_id, changes)
+
+def pending_plan_ids():
+    """Plans with task changes queued in this session"""
+    return [
+        key[len("pending_"):] for key in list(st.session_state.keys())
+        if key.startswith("pending_") and not key.startswith("pending_since_")
+    ]
+
+def save_all_progress():
+    """Save the queued task changes of every plan, before navigating away from them"""
+    for plan_id in pending_plan_ids():
+        save_progress(plan_id)
+
+def autosave_progress():
+    """Save the queues that have piled up or waited long enough, whichever page is shown"""
+    for plan_id in pending_plan_ids():
+        pending = st.session_state[f"pending_{plan_id}"]
+        if pending and (len(pending) >= AUTOSAVE_CHANGES or
+                        time.time() - st.session_state[f"pending_since_{plan_id}"] >= AUTOSAVE_SECONDS):
+            save_progress(plan_id)
+
+def discard_progress(plan_id):
+    """Drop the queued task changes of a plan and reset their checkboxes"""
+    for i in st.session_state.pop(f"pending_{plan_id}", {}):
+        st.session_state.pop(f"task_{plan_id}_{i}", None)
+    st.session_state.pop(f"pending_since_{plan_id}", None)
+
+def display_plan(plan, show_progress=True, editable=True):
     st.subheader("Your Personalized Study Plan")
     
-    # Get progress tracking for this plan
+    # Checkbox changes not yet saved (main() autosaves the old or large queues)
+    pending = st.session_state.get(f"pending_{plan['id']}", {})
+    
+    # Get progress tracking for this plan, with the unsaved changes applied locally
     progress = st.session_state.db.get_progress(plan['id'])
+    stored = set(progress['completed_tasks'])
+    completed = {i for i in stored if pending.get(i, True)} | {i for i, checked in pending.items() if checked}
+    total_tasks = progress['total_tasks'] or len(plan['tasks'])
     
     # Display plan details
     st.markdown(f"**Plan Type:** {plan['type']}")
@@ -394,87 +511,64 @@ def display_plan(plan, show_progress=True):
     
     # Display progress only if show_progress is True
     if show_progress:
-        completion_percentage = progress['completion_percentage']
+        completion_percentage = (len(completed) / total_tasks) * 100 if total_tasks else 0
         
         st.subheader("Progress")
-        progress_bar = st.progress(completion_percentage / 100)
+        st.progress(completion_percentage / 100)
         st.markdown(f"**{completion_percentage:.1f}%** completed")
     
-    # Display tasks with checkboxes
+    # Ticks are queued and written together, instead of one save and rerun each
+    if editable and pending:
+        col1, col2, col3 = st.columns([0.5, 0.25, 0.25])
+        with col1:
+            st.info(f"{len(pending)} unsaved change(s)")
+        with col2:
+            st.button("Save progress", key=f"save_{plan['id']}", on_click=save_progress, args=(plan['id'],))
+        with col3:
+            st.button("Discard changes", key=f"discard_{plan['id']}", on_click=discard_progress, args=(plan['id'],))
+    
+    # Display tasks with checkboxes, one filtered page at a time so the
+    # number of widgets stays the same however long the plan is
     st.subheader("Tasks")
     
+    tasks = plan['tasks']
+    days = task_days(tasks)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        day = st.selectbox("Date", ["All dates"] + days, key=f"filter_day_{plan['id']}")
+    with col2:
+        subjects = st.multiselect("Subject", task_subjects(tasks), key=f"filter_subject_{plan['id']}")
+    with col3:
+        status = st.selectbox("Status", STATUSES, key=f"filter_status_{plan['id']}")
+    with col4:
+        page_size = st.selectbox("Tasks per page", PAGE_SIZES, key=f"page_size_{plan['id']}")
+    
+    indices = filter_tasks(tasks, completed, None if day == "All dates" else day, subjects, status)
+    pages = page_count(len(indices), page_size)
+    page = 1
+    if pages > 1:
+        # Keyed by the page count, so a narrower filter starts again at page 1
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                               key=f"task_page_{plan['id']}_{pages}")
+    visible = page_slice(indices, page, page_size)
+    st.caption(f"Showing {len(visible)} of {len(indices)} matching tasks ({len(tasks)} in total)")
+    
     # Create a container for task updates to avoid rerunning the whole app
     task_container = st.container()
     
     with task_container:
-        for i, task in enumerate(plan['tasks']):
-            col1, col2, col3 = st.columns([0.1, 0.8, 0.1])
-            
-            with col1:
-                # Check if task is already completed
-                is_completed = i in progress['completed_tasks']
-                task_key = f"task_{plan['id']}_{i}"
-                checked = st.checkbox("", value=is_completed, key=task_key)
-                
-                # Update progress if checkbox state changed
-                if checked != is_completed:
-                    # Create a copy of the completed tasks list
-                    completed_tasks = progress['completed_tasks'].copy()
-                    
-                    if checked:
-                        if i not in completed_tasks:
-                            completed_tasks.append(i)
-                    else:
-                        if i in completed_tasks:
-                            completed_tasks.remove(i)
-                    
-                    # Calculate new completion percentage
-                    new_percentage = (len(completed_tasks) / progress['total_tasks']) * 100
-                    
-                    # Update progress in the database
-                    st.session_state.db.update_progress(plan['id'], {
-                        'completed_tasks': completed_tasks,
-                        'total_tasks': progress['total_tasks'],
-                        'completion_percentage': new_percentage
-                    })
-                    
-                    # Refresh the progress display if showing progress
-                    if show_progress:
-                        progress_bar.progress(new_percentage / 100)
-                        st.markdown(f"**{new_percentage:.1f}%** completed")
-                    
-                    # Rerun the app to update all views
-                    st.experimental_rerun()
-            
-            with col2:
-                # Display task with appropriate styling based on priority and completion
-                priority_class = ""
-                if 'priority' in task:
-                    if task['priority'] == 'High':
-                        priority_class = "priority-high"
-                    elif task['priority'] == 'Medium':
-                        priority_class = "priority-medium"
-                    elif task['priority'] == 'Low':
-                        priority_class = "priority-low"
-                
-                task_time = f"{task['start_time']} - {task['end_time']}" if 'start_time' in task and 'end_time' in task else ""
-                
-                st.markdown(
-                    f"<div class='{priority_class}'>"
-                    f"{task['subject']}: {task['description']} ({task_time})"
-                    f"</div>",
-                    unsafe_allow_html=True
-                )
-            
-            with col3:
-                # Display emoji based on task type
-                if 'type' in task:
-                    if task['type'] == 'study':
-                        st.markdown("📚")
-                    elif task['type'] == 'break':
-                        st.markdown("☕")
-                    elif task['type'] == 'review':
-                        st.markdown("🔍")
+        for group_index, (group_day, group) in enumerate(group_by_day(tasks, visible)):
+            # Undated tasks (older Quick Study plans) are listed without a day heading
+            if group_day is None:
+                day_container = st.container()
+            else:
+                day_done = sum(1 for i in group if i in completed)
+                day_container = st.expander(f"{group_day} ({day_done}/{len(group)} done)",
+                                            expanded=group_index == 0)
+            with day_container:
+                for i in group:
+                    display_task(plan, i, tasks[i], i in completed, i in stored, editable)
     
     # Display study techniques and resources in separate containers to avoid nesting expanders
     st.subheader("Study Techniques")
@@ -486,6 +580,49 @@ def display_plan(plan, show_progress=True):
         st.markdown(f"**{resource['subject']}**: [{resource['title']}]({resource['url']})")
         st.markdown(f"Type: {resource['type']} | Difficulty: {resource['difficulty']}")
 
+def display_task(plan, i, task, is_completed, stored, editable=True):
+    col1, col2, col3 = st.columns([0.1, 0.8, 0.1])
+    
+    with col1:
+        task_key = f"task_{plan['id']}_{i}"
+        if editable:
+            # The change is only queued; save_progress writes it with the others
+            st.checkbox("", value=is_completed, key=task_key,
+                        on_change=stage_task, args=(plan['id'], i, stored))
+        else:
+            # The preview on the create page is read-only; tasks are ticked off when viewing the plan
+            st.checkbox("", value=is_completed, key=task_key, disabled=True)
+    
+    with col2:
+        # Display task with appropriate styling based on priority and completion
+        priority_class = ""
+        if 'priority' in task:
+            if task['priority'] == 'High':
+                priority_class = "priority-high"
+            elif task['priority'] == 'Medium':
+                priority_class = "priority-medium"
+            elif task['priority'] == 'Low':
+                priority_class = "priority-low"
+        
+        task_time = f"{task['start_time']} - {task['end_time']}" if 'start_time' in task and 'end_time' in task else ""
+        
+        st.markdown(
+            f"<div class='{priority_class}'>"
+            f"{task['subject']}: {task['description']} ({task_time})"
+            f"</div>",
+            unsafe_allow_html=True
+        )
+    
+    with col3:
+        # Display emoji based on task type
+        if 'type' in task:
+            if task['type'] == 'study':
+                st.markdown("📚")
+            elif task['type'] == 'break':
+                st.markdown("☕")
+            elif task['type'] == 'review':
+                st.markdown("🔍")
+
 def view_plans_page():
     st.title("Your Study Plans")
     
@@ -502,9 +639,24 @@ def view_plans_page():
         if plan:
             # Add a back button
             if st.button("← Back to Plans"):
+                save_progress(plan['id'])
                 st.session_state.view_plan_id = None
                 st.experimental_rerun()
-            
+
+            # Move overdue sessions onto the days left, keeping every other task in place
+            if st.button("Reschedule Overdue Tasks"):
+                # Tasks ticked but not yet saved must not be moved
+                save_progress(plan['id'])
+                try:
+                    plan, unscheduled = replan(st.session_state.db, plan['id'])
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    if unscheduled:
+                        st.warning(f"{len(unscheduled)} task(s) no longer fit before the deadline and kept their old time.")
+                    else:
+                        st.success("Overdue tasks have been rescheduled!")
+
             # Display the plan
             display_plan(plan)
             return
@@ -599,14 +751,31 @@ def calendar_page():
             event_start_time = st.time_input("Start Time")
             event_end_time = st.time_input("End Time")
             event_description = st.text_area("Description")
+            allow_overlap = st.checkbox("Allow overlapping sessions")
             
             submitted = st.form_submit_button("Add to Calendar")
             
             if submitted:
+                # Existing events and plan tasks that day, for overlap checks
+                busy = BusyIndex.from_database(st.session_state.db, event_date, event_date)
+                conflicts = busy.conflicts(event_date, event_start_time, event_end_time)
+                
                 if not event_title:
                     st.error("Please enter a title for the event")
                 elif event_end_time <= event_start_time:
                     st.error("End time must be after start time")
+                elif conflicts and not allow_overlap:
+                    st.error("This session overlaps: " + ", ".join(
+                        f"{ref['title']} ({ref['start_time']} - {ref['end_time']})" for _, _, ref in conflicts
+                    ))
+                    
+                    # Suggest free slots of the same length that day
+                    length = (event_end_time.hour * 60 + event_end_time.minute) - (event_start_time.hour * 60 + event_start_time.minute)
+                    slots = busy.free_slots(event_date, length, [('08:00', '22:00')])
+                    if slots:
+                        st.info("Free that day: " + ", ".join(
+                            f"{minutes_to_time(start)} - {minutes_to_time(end)}" for start, end in slots
+                        ))
                 else:
                     # Create new calendar event
                     new_event = {
@@ -626,141 +795,81 @@ def calendar_page():
         # Display upcoming events
         st.subheader("Upcoming Study Sessions")
         
-        calendar_events = st.session_state.db.get_calendar_events()
+        # Future events, already sorted by date and start time by the date index
+        upcoming_events = st.session_state.db.upcoming()
         
-        if not calendar_events:
+        if not upcoming_events:
             st.info("No upcoming study sessions scheduled")
         else:
-            # Sort events by date
-            sorted_events = sorted(
-                calendar_events,
-                key=lambda x: (x['date'], x['start_time'])
-            )
-            
             # Display events
-            for event in sorted_events:
-                event_date = datetime.strptime(event['date'], "%Y-%m-%d").date()
-                
-                # Only show future events
-                if event_date >= datetime.now().date():
-                    with st.expander(f"{event['date']} - {event['title']}"):
-                        st.markdown(f"**Time:** {event['start_time']} - {event['end_time']}")
-                        st.markdown(f"**Description:** {event['description']}")
-                        
-                        # Delete button
-                        if st.button("Remove", key=f"remove_event_{event['id']}"):
-                            st.session_state.db.delete_calendar_event(event['id'])
-                            st.success("Event removed from calendar!")
-                            st.experimental_rerun()
+            for event in upcoming_events:
+                with st.expander(f"{event['date']} - {event['title']}"):
+                    st.markdown(f"**Time:** {event['start_time']} - {event['end_time']}")
+                    st.markdown(f"**Description:** {event['description']}")
+                    
+                    # Delete button
+                    if st.button("Remove", key=f"remove_event_{event['id']}"):
+                        st.session_state.db.delete_calendar_event(event['id'])
+                        st.success("Event removed from calendar!")
+                        st.experimental_rerun()
     
     # Calendar visualization
-    st.subheader("Monthly Calendar View")
+    st.subheader("Calendar View")
     
-    # Get current month and year
     today = datetime.now()
-    month = st.selectbox("Month", range(1, 13), index=today.month - 1)
-    year = st.selectbox("Year", range(today.year, today.year + 5), index=0)
+    view = st.radio("View", ["Month", "Week", "Agenda"], horizontal=True)
+    
+    if view == "Month":
+        # Get current month and year
+        month = st.selectbox("Month", range(1, 13), index=today.month - 1)
+        year = st.selectbox("Year", range(today.year, today.year + 5), index=0)
+        
+        # Display the calendar; the grid is re-rendered only when the month,
+        # the day or the calendar events change
+        st.markdown("### Calendar")
+        cal_html = get_month_calendar(st.session_state.db).render(year, month, today.date())
+        st.markdown(cal_html, unsafe_allow_html=True)
+    
+    elif view == "Week":
+        # Events (green) and study plan sessions (blue) of the chosen week
+        start = week_start(st.date_input("Week of", today.date()))
+        st.markdown(f"### Week of {start.strftime('%d %B %Y')}")
+        cal_html = render_week(start, week_entries(st.session_state.db, start), today.date())
+        st.markdown(cal_html, unsafe_allow_html=True)
     
-    # Create calendar data
-    cal_data = []
-    
-    # Get the first day of the month and the number of days
-    first_day = datetime(year, month, 1)
-    if month == 12:
-        last_day = datetime(year + 1, 1, 1) - timedelta(days=1)
     else:
-        last_day = datetime(year, month + 1, 1) - timedelta(days=1)
-    
-    num_days = last_day.day
-    
-    # Create calendar grid
-    day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    
-    # Create a 6x7 grid for the calendar
-    calendar_grid = []
-    
-    # Fill in the calendar grid
-    day = 1
-    for week in range(6):
-        week_row = []
-        for weekday in range(7):
-            if week == 0 and weekday < first_day.weekday():
-                # Empty cells before the first day of the month
-                week_row.append({"day": "", "events": []})
-            elif day > num_days:
-                # Empty cells after the last day of the month
-                week_row.append({"day": "", "events": []})
-            else:
-                # Regular day cells
-                date_str = f"{year}-{month:02d}-{day:02d}"
-                events = [e for e in calendar_events if e['date'] == date_str]
-                week_row.append({"day": day, "events": events})
-                day += 1
-        calendar_grid.append(week_row)
-    
-    # Display the calendar
-    st.markdown("### Calendar")
-    
-    # Create a table for the calendar
-    cal_html = '<table style="width:100%; border-collapse: collapse;">'
-    
-    # Add header row with day names
-    cal_html += '<tr>'
-    for day_name in day_names:
-        cal_html += f'<th style="border: 1px solid #ddd; padding: 8px; text-align: center;">{day_name}</th>'
-    cal_html += '</tr>'
-    
-    # Add calendar days
-    for week in calendar_grid:
-        cal_html += '<tr>'
-        for day_cell in week:
-            if day_cell["day"] == "":
-                # Empty cell
-                cal_html += '<td style="border: 1px solid #ddd; padding: 8px; height: 80px;"></td>'
-            else:
-                # Day cell with events
-                cell_style = 'border: 1px solid #ddd; padding: 8px; height: 80px; vertical-align: top;'
-                
-                # Highlight today
-                if day_cell["day"] == today.day and month == today.month and year == today.year:
-                    cell_style += 'background-color: #e6f7ff;'
-                
-                cal_html += f'<td style="{cell_style}">'
-                cal_html += f'<div style="font-weight: bold;">{day_cell["day"]}</div>'
-                
-                # Add events for this day
-                for event in day_cell["events"]:
-                    cal_html += f'<div style="margin-top: 2px; padding: 2px; background-color: #4CAF50; color: white; border-radius: 3px; font-size: 0.8em;">{event["title"]}</div>'
-                
-                cal_html += '</td>'
-        cal_html += '</tr>'
-    
-    cal_html += '</table>'
-    
-    st.markdown(cal_html, unsafe_allow_html=True)
+        # Upcoming events and study plan sessions; only the shown entries are fetched
+        limit = st.selectbox("Show", [AGENDA_LIMIT, AGENDA_LIMIT * 2, AGENDA_LIMIT * 4],
+                             format_func=lambda count: f"Next {count} entries")
+        entries = agenda_entries(st.session_state.db, today.date(), limit)
+        if not entries:
+            st.info("Nothing scheduled from today on")
+        else:
+            st.markdown(render_agenda(entries, today.date()), unsafe_allow_html=True)
 
 def insights_page():
+    # Plotting libraries are only loaded once this page is opened
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     st.title("Study Insights")
     
-    plans = st.session_state.db.get_plans()
+    # Aggregates are maintained by the store as plans and progress change
+    insights = st.session_state.db.get_insights()
     
-    if not plans:
+    if not insights['total_plans']:
         st.info("You haven't created any study plans yet. Go to 'Create Plan' to get started!")
         return
     
-    # Calculate insights
-    total_tasks = sum(len(plan['tasks']) for plan in plans)
-    completed_tasks = sum(len(st.session_state.db.get_progress(plan['id']).get('completed_tasks', [])) 
-                         for plan in plans)
-    
-    completion_rate = (completed_tasks / total_tasks) * 100 if total_tasks > 0 else 0
+    total_tasks = insights['total_tasks']
+    completion_rate = insights['completion_rate']
     
     # Display overall statistics
     st.subheader("Overall Statistics")
     
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Plans", len(plans))
+        st.metric("Total Plans", insights['total_plans'])
     with col2:
         st.metric("Total Tasks", total_tasks)
     with col3:
@@ -769,22 +878,8 @@ def insights_page():
     # Subject breakdown
     st.subheader("Subject Breakdown")
     
-    # Collect subject data
-    subject_data = {}
-    for plan in plans:
-        for task in plan['tasks']:
-            if 'subject' in task and task['subject'] != 'Break':
-                subject = task['subject']
-                if subject not in subject_data:
-                    subject_data[subject] = {'total': 0, 'completed': 0}
-                
-                subject_data[subject]['total'] += 1
-                
-                # Check if task is completed
-                progress = st.session_state.db.get_progress(plan['id'])
-                task_index = plan['tasks'].index(task)
-                if task_index in progress.get('completed_tasks', []):
-                    subject_data[subject]['completed'] += 1
+    # Per-subject task counts (breaks excluded)
+    subject_data = insights['subjects']
     
     # Create subject breakdown chart
     if subject_data:
@@ -876,478 +971,6 @@ def insights_page():
     4. **Use active recall** - This technique has shown good results for your learning style
     """)
 
-# Simulated AI functions
-def generate_quick_study_plan(subjects, topics, start_time, end_time, break_duration, 
-                            break_frequency, preferred_activities, special_events, 
-                            learning_style, priority_settings):
-    # In a real app, this would use AI to generate a personalized plan
-    # For this example, we'll create a simulated plan
-    
-    plan_id = f"plan_{datetime.now().timestamp()}"
-    
-    # Parse priorities
-    priorities = {}
-    if priority_settings:
-        for line in priority_settings.split('\n'):
-            if ':' in line:
-                item, priority = line.split(':', 1)
-                priorities[item.strip()] = priority.strip()
-    
-    # Create tasks
-    tasks = []
-    current_time = datetime.combine(datetime.today(), start_time)
-    end_datetime = datetime.combine(datetime.today(), end_time)
-    
-    task_id = 0
-    
-    # Generate more tasks by creating multiple subtasks for each topic
-    for subject in subjects:
-        if subject in topics:
-            for topic in topics[subject]:
-                # Determine priority
-                priority = "Medium"  # Default
-                for key in priorities:
-                    if key == subject or key == f"{subject}/{topic}":
-                        priority = priorities[key]
-                
-                # Create multiple subtasks for each topic (3-4 subtasks)
-                subtasks = [
-                    f"Read about {topic}",
-                    f"Take notes on {topic}",
-                    f"Practice problems on {topic}",
-                    f"Review {topic} concepts"
-                ]
-                
-                for subtask in subtasks:
-                    # Study session
-                    session_end = current_time + timedelta(minutes=break_frequency // 2)  # Shorter sessions
-                    if session_end > end_datetime:
-                        session_end = end_datetime
-                    
-                    tasks.append({
-                        'id': task_id,
-                        'subject': subject,
-                        'description': subtask,
-                        'start_time': current_time.strftime("%H:%M"),
-                        'end_time': session_end.strftime("%H:%M"),
-                        'type': 'study',
-                        'priority': priority
-                    })
-                    task_id += 1
-                    
-                    current_time = session_end
-                    
-                    # Break
-                    if current_time < end_datetime:
-                        break_end = current_time + timedelta(minutes=break_duration)
-                        if break_end > end_datetime:
-                            break_end = end_datetime
-                        
-                        # Choose a random break activity
-                        activity = "Take a break"
-                        if preferred_activities:
-                            activity = f"{random.choice(preferred_activities)}"
-                        
-                        tasks.append({
-                            'id': task_id,
-                            'subject': 'Break',
-                            'description': activity,
-                            'start_time': current_time.strftime("%H:%M"),
-                            'end_time': break_end.strftime("%H:%M"),
-                            'type': 'break'
-                        })
-                        task_id += 1
-                        
-                        current_time = break_end
-                    
-                    if current_time >= end_datetime:
-                        break
-                
-                if current_time >= end_datetime:
-                    break
-            
-            if current_time >= end_datetime:
-                break
-    
-    # Generate study techniques based on learning style
-    study_techniques = generate_study_technique(learning_style)
-    
-    # Generate resource recommendations
-    resources = generate_resource_recommendations(subjects, learning_style)
-    
-    # Create the plan
-    plan = {
-        'id': plan_id,
-        'type': 'Quick Study',
-        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M"),
-        'tasks': tasks,
-        'study_techniques': study_techniques,
-        'resources': resources
-    }
-    
-    return plan
-
-def generate_exam_time_plan(subjects, exam_date, daily_hours, difficulty_dict, 
-                          preferred_time, special_events, learning_style, priority_settings):
-    # In a real app, this would use AI to generate a personalized plan
-    # For this example, we'll create a simulated plan
-    
-    plan_id = f"plan_{datetime.now().timestamp()}"
-    
-    # Parse priorities
-    priorities = {}
-    if priority_settings:
-        for line in priority_settings.split('\n'):
-            if ':' in line:
-                item, priority = line.split(':', 1)
-                priorities[item.strip()] = priority.strip()
-    
-    # Calculate days until exam
-    today = datetime.now().date()
-    days_until_exam = max(1, (exam_date - today).days)
-    
-    # Create tasks
-    tasks = []
-    task_id = 0
-    
-    # Distribute study time based on difficulty and priority
-    total_difficulty = sum(difficulty_dict.get(subject, 3) for subject in subjects)
-    
-    # Ensure we have at least 7-8 tasks
-    min_tasks = 8
-    current_task_count = 0
-    
-    for subject in subjects:
-        # Determine priority
-        priority = priorities.get(subject, "Medium")
-        
-        # Determine difficulty
-        difficulty = difficulty_dict.get(subject, 3)
-        
-        # Calculate study days based on difficulty and priority
-        priority_multiplier = 1.5 if priority == "High" else (1.0 if priority == "Medium" else 0.7)
-        subject_days = max(1, int((difficulty / total_difficulty) * days_until_exam * priority_multiplier))
-        
-        # For short time gaps, ensure we create enough tasks by adding multiple sessions per day
-        sessions_per_day = 1
-        if days_until_exam < 4 and len(subjects) < 4:
-            sessions_per_day = max(2, 8 // (len(subjects) * days_until_exam))
-        
-        # Create study sessions for this subject
-        for day in range(min(subject_days, days_until_exam)):
-            current_date = today + timedelta(days=day)
-            
-            # Skip weekends if preferred
-            if current_date.weekday() >= 5 and "Weekend" not in preferred_time:
-                continue
-            
-            # Create multiple sessions per day if needed
-            for session in range(sessions_per_day):
-                # Determine study time based on preferences and session number
-                if "Morning" in preferred_time and session == 0:
-                    start_time = "08:00"
-                    end_time = f"{8 + min(daily_hours // sessions_per_day, 3):02d}:00"
-                elif "Afternoon" in preferred_time or session == 1:
-                    start_time = "13:00"
-                    end_time = f"{13 + min(daily_hours // sessions_per_day, 3):02d}:00"
-                elif "Evening" in preferred_time or session == 2:
-                    start_time = "17:00"
-                    end_time = f"{17 + min(daily_hours // sessions_per_day, 3):02d}:00"
-                else:  # Night or additional sessions
-                    start_time = "20:00"
-                    end_time = f"{20 + min(daily_hours // sessions_per_day, 3):02d}:00"
-                
-                # Create different task descriptions for multiple sessions
-                if sessions_per_day == 1:
-                    description = f"Study {subject} - Day {day + 1}"
-                else:
-                    if session == 0:
-                        description = f"Read and understand {subject} concepts"
-                    elif session == 1:
-                        description = f"Practice problems on {subject}"
-                    elif session == 2:
-                        description = f"Review and summarize {subject}"
-                    else:
-                        description = f"Additional practice on {subject}"
-                
-                tasks.append({
-                    'id': task_id,
-                    'subject': subject,
-                    'description': description,
-                    'date': current_date.strftime("%Y-%m-%d"),
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'type': 'study',
-                    'priority': priority
-                })
-                task_id += 1
-                current_task_count += 1
-            
-            # Add review session
-            if day > 0 and day % 2 == 0:
-                review_date = current_date
-                
-                tasks.append({
-                    'id': task_id,
-                    'subject': subject,
-                    'description': f"Review {subject} - Quick recap",
-                    'date': review_date.strftime("%Y-%m-%d"),
-                    'start_time': "21:00",
-                    'end_time': "22:00",
-                    'type': 'review',
-                    'priority': priority
-                })
-                task_id += 1
-                current_task_count += 1
-    
-    # If we still don't have enough tasks, add some general study sessions
-    if current_task_count < min_tasks:
-        additional_tasks_needed = min_tasks - current_task_count
-        
-        # Add general review sessions
-        for i in range(additional_tasks_needed):
-            day_index = i % max(1, days_until_exam)
-            current_date = today + timedelta(days=day_index)
-            
-            # Alternate between different types of tasks
-            if i % 3 == 0:
-                description = "Final review of all subjects"
-                task_type = "review"
-            elif i % 3 == 1:
-                description = "Practice mock exam questions"
-                task_type = "study"
-            else:
-                description = "Summarize key concepts"
-                task_type = "study"
-            
-            tasks.append({
-                'id': task_id,
-                'subject': "All Subjects",
-                'description': description,
-                'date': current_date.strftime("%Y-%m-%d"),
-                'start_time': "19:00",
-                'end_time': "20:00",
-                'type': task_type,
-                'priority': "High"
-            })
-            task_id += 1
-    
-    # Generate study techniques based on learning style
-    study_techniques = generate_study_technique(learning_style)
-    
-    # Generate resource recommendations
-    resources = generate_resource_recommendations(subjects, learning_style)
-    
-    # Create the plan
-    plan = {
-        'id': plan_id,
-        'type': 'Exam Time',
-        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M"),
-        'exam_date': exam_date.strftime("%Y-%m-%d"),
-        'tasks': tasks,
-        'study_techniques': study_techniques,
-        'resources': resources
-    }
-    
-    return plan
-
-def generate_submissions_plan(assignments, due_date_dict, daily_hours, 
-                            complexity_dict, preferred_time, special_events, 
-                            work_style, priority_settings):
-    # In a real app, this would use AI to generate a personalized plan
-    # For this example, we'll create a simulated plan
-    
-    plan_id = f"plan_{datetime.now().timestamp()}"
-    
-    # Parse priorities
-    priorities = {}
-    if priority_settings:
-        for line in priority_settings.split('\n'):
-            if ':' in line:
-                item, priority = line.split(':', 1)
-                priorities[item.strip()] = priority.strip()
-    
-    # Create tasks
-    tasks = []
-    task_id = 0
-    
-    today = datetime.now().date()
-    
-    # Sort assignments by due date
-    sorted_assignments = sorted(
-        [(a, due_date_dict.get(a, today + timedelta(days=7))) for a in assignments],
-        key=lambda x: x[1]
-    )
-    
-    # Ensure we have at least 7-8 tasks
-    min_tasks = 8
-    current_task_count = 0
-    
-    for assignment, due_date in sorted_assignments:
-        # Determine priority
-        priority = priorities.get(assignment, "Medium")
-        
-        # Determine complexity
-        complexity = complexity_dict.get(assignment, 3)
-        
-        # Calculate days available
-        days_available = max(1, (due_date - today).days)
-        
-        # Calculate days needed based on complexity and work style
-        if work_style == "Focused Sessions":
-            days_needed = max(1, complexity // 2)
-        elif work_style == "Spread Out":
-            days_needed = complexity
-        else:  # Deadline Driven
-            days_needed = max(1, complexity // 3)
-        
-        # Adjust days needed if not enough days available
-        days_needed = min(days_needed, days_available)
-        
-        # For short time gaps, ensure we create enough tasks by adding multiple sessions per day
-        sessions_per_day = 1
-        if days_available < 4 and len(assignments) < 4:
-            sessions_per_day = max(2, 8 // (len(assignments) * days_available))
-        
-        # Create a list of task descriptions based on the assignment type
-        task_descriptions = []
-        
-        # Generate different task descriptions based on the assignment
-        if sessions_per_day == 1:
-            if days_needed == 1:
-                task_descriptions = [f"Complete {assignment}"]
-            else:
-                task_descriptions = [
-                    f"Start {assignment} - Research and planning",
-                    f"Continue {assignment} - Draft initial content",
-                    f"Continue {assignment} - Develop main sections",
-                    f"Finalize {assignment} - Review and polish",
-                    f"Submit {assignment}"
-                ]
-                # Trim or repeat descriptions to match days_needed
-                if len(task_descriptions) > days_needed:
-                    task_descriptions = task_descriptions[:days_needed]
-                while len(task_descriptions) < days_needed:
-                    task_descriptions.append(f"Continue working on {assignment}")
-        else:
-            # More detailed tasks for multiple sessions per day
-            task_descriptions = [
-                f"Research for {assignment}",
-                f"Create outline for {assignment}",
-                f"Draft introduction for {assignment}",
-                f"Develop main content for {assignment}",
-                f"Create supporting materials for {assignment}",
-                f"Review and edit {assignment}",
-                f"Finalize and format {assignment}",
-                f"Submit {assignment}"
-            ]
-        
-        # Distribute work across days
-        day_index = 0
-        for task_desc in task_descriptions:
-            if day_index >= days_needed and sessions_per_day == 1:
-                break
-                
-            work_date = today + timedelta(days=day_index)
-            
-            # For multiple sessions per day, create multiple tasks on the same day
-            if sessions_per_day > 1:
-                session_index = task_descriptions.index(task_desc) % sessions_per_day
-                day_index = task_descriptions.index(task_desc) // sessions_per_day
-                if day_index >= days_needed:
-                    break
-                work_date = today + timedelta(days=day_index)
-            else:
-                session_index = 0
-            
-            # Determine work time based on preferences and session number
-            if "Morning" in preferred_time and session_index == 0:
-                start_time = "08:00"
-                end_time = f"{8 + min(daily_hours // sessions_per_day, 3):02d}:00"
-            elif "Afternoon" in preferred_time or session_index == 1:
-                start_time = "13:00"
-                end_time = f"{13 + min(daily_hours // sessions_per_day, 3):02d}:00"
-            elif "Evening" in preferred_time or session_index == 2:
-                start_time = "17:00"
-                end_time = f"{17 + min(daily_hours // sessions_per_day, 3):02d}:00"
-            else:  # Night or additional sessions
-                start_time = "20:00"
-                end_time = f"{20 + min(daily_hours // sessions_per_day, 3):02d}:00"
-            
-            tasks.append({
-                'id': task_id,
-                'subject': assignment,
-                'description': task_desc,
-                'date': work_date.strftime("%Y-%m-%d"),
-                'start_time': start_time,
-                'end_time': end_time,
-                'type': 'study',
-                'priority': priority
-            })
-            task_id += 1
-            current_task_count += 1
-            
-            if sessions_per_day == 1:
-                day_index += 1
-    
-    # If we still don't have enough tasks, add some general tasks
-    if current_task_count < min_tasks:
-        additional_tasks_needed = min_tasks - current_task_count
-        
-        general_tasks = [
-            "Review all assignments for consistency",
-            "Check formatting and citations",
-            "Prepare submission documents",
-            "Create backup copies of all work",
-            "Verify submission requirements",
-            "Proofread all assignments",
-            "Organize supporting materials",
-            "Final review before submission"
-        ]
-        
-        for i in range(additional_tasks_needed):
-            day_index = i % max(1, days_available)
-            current_date = today + timedelta(days=day_index)
-            
-            task_desc = general_tasks[i % len(general_tasks)]
-            
-            tasks.append({
-                'id': task_id,
-                'subject': "All Assignments",
-                'description': task_desc,
-                'date': current_date.strftime("%Y-%m-%d"),
-                'start_time': "19:00",
-                'end_time': "20:00",
-                'type': 'study',
-                'priority': "Medium"
-            })
-            task_id += 1
-    
-    # Generate study techniques based on work style
-    if work_style == "Focused Sessions":
-        technique_style = "Visual"
-    elif work_style == "Spread Out":
-        technique_style = "Mixed"
-    else:  # Deadline Driven
-        technique_style = "Reading"
-    
-    study_techniques = generate_study_technique(technique_style)
-    
-    # Generate resource recommendations
-    resources = generate_resource_recommendations(assignments, technique_style)
-    
-    # Create the plan
-    plan = {
-        'id': plan_id,
-        'type': 'Submissions',
-        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M"),
-        'tasks': tasks,
-        'study_techniques': study_techniques,
-        'resources': resources
-    }
-    
-    return plan
-
 # Run the app
 if __name__ == "__main__":
     main()
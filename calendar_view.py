@@ -0,0 +1,190 @@
+# Month, week and agenda calendar views rendered to HTML
+#
+# The month table only changes when the month, the highlighted day or the
+# calendar events change, so it is memoized per (year, month, events version,
+# today). The events version is bumped through the store's change feed
+# whenever an event is added or removed (or the store is reloaded), which
+# also drops the stale months. A repeat visit to a month is a dict lookup.
+#
+# The week and agenda views also show dated plan tasks. The stores hand them
+# out already merged with the events in date order from their date indexes,
+# so only the visible week, or the first `limit` agenda entries, are ever
+# materialized, however many plans there are.
+
+import calendar
+import html
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+# Months kept per store
+CACHE_SIZE = 24
+
+DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+TABLE_STYLE = "width:100%; border-collapse: collapse;"
+HEADER_STYLE = "border: 1px solid #ddd; padding: 8px; text-align: center;"
+EMPTY_STYLE = "border: 1px solid #ddd; padding: 8px; height: 80px;"
+DAY_STYLE = "border: 1px solid #ddd; padding: 8px; height: 80px; vertical-align: top;"
+TODAY_STYLE = "background-color: #e6f7ff;"
+EVENT_STYLE = ("margin-top: 2px; padding: 2px; background-color: #4CAF50; color: white; "
+               "border-radius: 3px; font-size: 0.8em;")
+TASK_STYLE = ("margin-top: 2px; padding: 2px; background-color: #2196F3; color: white; "
+              "border-radius: 3px; font-size: 0.8em;")
+
+# Entries shown by the agenda view unless asked for more
+AGENDA_LIMIT = 50
+
+# Rows shown for every month, so the grid keeps its height
+WEEKS = 6
+
+def render_month(year, month, events_by_date, today=None):
+    """
+    Render a month as an HTML table.
+
+    Args:
+        year (int): Year
+        month (int): Month, 1-12
+        events_by_date (dict): YYYY-MM-DD -> events of that day, in display order
+        today (date): Day to highlight, if it falls in this month
+
+    Returns:
+        str: The table's HTML
+    """
+    weeks = calendar.monthcalendar(year, month)
+    weeks += [[0] * 7] * (WEEKS - len(weeks))
+    parts = [f'<table style="{TABLE_STYLE}"><tr>']
+    parts.extend(f'<th style="{HEADER_STYLE}">{name}</th>' for name in DAY_NAMES)
+    parts.append('</tr>')
+    for week in weeks:
+        parts.append('<tr>')
+        for day in week:
+            if not day:
+                parts.append(f'<td style="{EMPTY_STYLE}"></td>')
+                continue
+            style = DAY_STYLE + TODAY_STYLE if today == date(year, month, day) else DAY_STYLE
+            parts.append(f'<td style="{style}"><div style="font-weight: bold;">{day}</div>')
+            parts.extend(
+                f'<div style="{EVENT_STYLE}">{html.escape(event["title"])}</div>'
+                for event in events_by_date.get(f"{year}-{month:02d}-{day:02d}", ())
+            )
+            parts.append('</td>')
+        parts.append('</tr>')
+    parts.append('</table>')
+    return "".join(parts)
+
+def week_start(day):
+    """The Monday of the week containing day"""
+    return day - timedelta(days=day.weekday())
+
+def _entry_html(entry):
+    """One event (green) or plan task (blue) with its start time"""
+    style = TASK_STYLE if "plan_id" in entry else EVENT_STYLE
+    label = f'{entry["start_time"]} {entry["title"]}' if entry.get("start_time") else entry["title"]
+    return f'<div style="{style}">{html.escape(label)}</div>'
+
+def render_week(start, entries, today=None):
+    """
+    Render the seven days from start as an HTML table.
+
+    Args:
+        start (date): First day shown, normally a Monday
+        entries (iterable): Events and dated tasks of those days, in date order
+        today (date): Day to highlight, if it falls in this week
+
+    Returns:
+        str: The table's HTML
+    """
+    days = [start + timedelta(days=offset) for offset in range(7)]
+    by_date = {}
+    for entry in entries:
+        by_date.setdefault(entry["date"], []).append(entry)
+    parts = [f'<table style="{TABLE_STYLE}"><tr>']
+    parts.extend(f'<th style="{HEADER_STYLE}">{day:%a} {day.day}</th>' for day in days)
+    parts.append('</tr><tr>')
+    for day in days:
+        style = DAY_STYLE + TODAY_STYLE if day == today else DAY_STYLE
+        parts.append(f'<td style="{style}">')
+        parts.extend(_entry_html(entry) for entry in by_date.get(day.strftime("%Y-%m-%d"), ()))
+        parts.append('</td>')
+    parts.append('</tr></table>')
+    return "".join(parts)
+
+def render_agenda(entries, today=None):
+    """Render events and dated tasks, in date order, as a list of day headings and entries"""
+    parts = []
+    day = None
+    for entry in entries:
+        if entry["date"] != day:
+            day = entry["date"]
+            heading = datetime.strptime(day, "%Y-%m-%d").strftime("%A, %d %B %Y")
+            if today is not None and day == today.strftime("%Y-%m-%d"):
+                heading += " (today)"
+            parts.append(f'<h4 style="margin-top: 12px;">{heading}</h4>')
+        parts.append(_entry_html(entry))
+    return "".join(parts)
+
+def week_entries(db, start):
+    """Calendar events and dated plan tasks of the seven days from start"""
+    return db.events_between(start, start + timedelta(days=6), include_tasks=True)
+
+def agenda_entries(db, today, limit=AGENDA_LIMIT):
+    """The first `limit` calendar events and dated plan tasks from today on"""
+    return db.upcoming(limit=limit, today=today, include_tasks=True)
+
+class MonthCalendar:
+    """Memoized month grids of one store's calendar events"""
+
+    def __init__(self, db, maxsize=CACHE_SIZE):
+        self.db = db
+        self.maxsize = maxsize
+        self.events_version = 0
+        self.hits = 0
+        self.misses = 0
+        self._months = OrderedDict()
+        self._lock = threading.Lock()
+        db.changes.subscribe(self._on_change)
+
+    def _on_change(self, version, kind, key):
+        """Change feed callback: any event change invalidates every cached month"""
+        if kind in ("event", "all"):
+            with self._lock:
+                self.events_version += 1
+                self._months.clear()
+
+    def render(self, year, month, today=None):
+        """HTML of a month's grid, rendered only if not cached for the current events"""
+        # Events changed by another process only reach the change feed on the
+        # store's next access, which must come before the cache lookup
+        self.db.refresh()
+        with self._lock:
+            key = (year, month, self.events_version, today)
+            html_table = self._months.get(key)
+            if html_table is not None:
+                self._months.move_to_end(key)
+                self.hits += 1
+                return html_table
+            self.misses += 1
+        events_by_date = {}
+        last_day = calendar.monthrange(year, month)[1]
+        for event in self.db.events_between(date(year, month, 1), date(year, month, last_day)):
+            events_by_date.setdefault(event["date"], []).append(event)
+        html_table = render_month(year, month, events_by_date, today)
+        with self._lock:
+            # An event changed while rendering: serve the result but do not keep it
+            if key[2] == self.events_version:
+                self._months[key] = html_table
+                while len(self._months) > self.maxsize:
+                    self._months.popitem(last=False)
+        return html_table
+
+_calendars = {}
+_calendars_lock = threading.Lock()
+
+def get_month_calendar(db):
+    """The MonthCalendar of a store, shared by every session using it"""
+    with _calendars_lock:
+        month_calendar = _calendars.get(db)
+        if month_calendar is None:
+            month_calendar = _calendars[db] = MonthCalendar(db)
+        return month_calendar
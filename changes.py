@@ -0,0 +1,57 @@
+# Change notifications shared by the storage backends
+
+from collections import deque
+
+# Number of recent changes remembered for ChangeFeed.since()
+CHANGE_LOG_SIZE = 1000
+
+class ChangeFeed:
+    """
+    Monotonic change-version counter with a publish/subscribe hook.
+
+    Every change to the store bumps `version` and is recorded as a
+    (kind, key) pair, e.g. ("plan", plan_id) or ("event", event_id).
+    The kind "all" means the whole store was reloaded or cleared.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._log = deque(maxlen=CHANGE_LOG_SIZE)
+        self._subscribers = []
+
+    def publish(self, kind, key=None):
+        """Record a change and notify subscribers"""
+        self.version += 1
+        self._log.append((self.version, kind, key))
+        for callback in list(self._subscribers):
+            callback(self.version, kind, key)
+
+    def subscribe(self, callback):
+        """
+        Call callback(version, kind, key) after every change.
+
+        Callbacks run while the store is locked, so they should only record
+        what changed and leave any re-fetching to the caller.
+
+        Returns:
+            function: Call it to unsubscribe
+        """
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+        return unsubscribe
+
+    def since(self, version):
+        """
+        Get the (kind, key) changes made after the given version.
+
+        Returns None when that version is older than the retained log, in
+        which case the caller should re-fetch everything.
+        """
+        if version >= self.version:
+            return []
+        if not self._log or self._log[0][0] > version + 1:
+            return None
+        return [(kind, key) for change_version, kind, key in self._log if change_version > version]
@@ -1,116 +1,899 @@
+import base64
+import heapq
 import json
 import os
-from datetime import datetime
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import date, datetime
+from itertools import islice
+
+from changes import ChangeFeed
+from models import Plan, as_dict
+from plan_codec import BodyFile, BodyRef, encode_body
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, single-process use only
+    fcntl = None
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+# Number of journal records after which the journal is folded into the snapshot
+COMPACT_THRESHOLD = 200
+
+# Completed-task sets remembered per plan for merging stale progress updates
+PROGRESS_HISTORY = 32
+
+def open_database(db_path="study_planner.json"):
+    """
+    Open the storage backend matching the file extension of db_path.
+
+    Paths ending in .db/.sqlite/.sqlite3 use the SQLite backend; anything
+    else uses the JSON file backend. Both expose the same API.
+    """
+    if db_path.lower().endswith(SQLITE_EXTENSIONS):
+        from sqlite_database import SQLiteDatabase
+        return SQLiteDatabase(db_path)
+    return Database(db_path)
+
+_shared_databases = {}
+_shared_lock = threading.Lock()
+
+def get_shared_database(db_path="study_planner.json"):
+    """
+    Get the process-wide store for db_path, opening it on first use.
+
+    Every caller in the process (e.g. each Streamlit session) shares the
+    same thread-safe instance instead of parsing its own copy of the file.
+    """
+    key = os.path.abspath(db_path)
+    with _shared_lock:
+        if key not in _shared_databases:
+            _shared_databases[key] = open_database(db_path)
+        return _shared_databases[key]
+
+def _pack_bitmap(indices):
+    """Encode a set of task indices as a base64 bitmap (bit i set = task i)"""
+    if not indices:
+        return ""
+    bits = bytearray(max(indices) // 8 + 1)
+    for i in indices:
+        bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bits)).decode("ascii")
+
+def _unpack_bitmap(text):
+    """Decode a bitmap produced by _pack_bitmap back into a set of indices"""
+    indices = set()
+    for byte_index, byte in enumerate(base64.b64decode(text)):
+        while byte:
+            low_bit = byte & -byte
+            indices.add(byte_index * 8 + low_bit.bit_length() - 1)
+            byte ^= low_bit
+    return indices
+
+def _merge_completed(latest, mine, base):
+    """Three-way merge of completed task sets; without a base every completion either side made is kept"""
+    if base is None:
+        return latest | mine
+    return (latest - (base - mine)) | (mine - base)
+
+def _decode_progress(progress):
+    """Stored progress -> in-memory form holding completed tasks as a set"""
+    if "completed_bitmap" in progress:
+        completed = _unpack_bitmap(progress["completed_bitmap"])
+    else:
+        completed = set(progress.get("completed_tasks", []))
+    return {
+        "completed": completed,
+        "total_tasks": progress.get("total_tasks", 0),
+        "completion_percentage": progress.get("completion_percentage", 0),
+        "version": progress.get("version", 0)
+    }
+
+def _encode_progress(progress):
+    """In-memory progress -> stored form with completed tasks as a packed bitmap"""
+    return {
+        "completed_bitmap": _pack_bitmap(progress["completed"]),
+        "total_tasks": progress["total_tasks"],
+        "completion_percentage": progress["completion_percentage"],
+        "version": progress["version"]
+    }
+
+def _date_key(value):
+    """Normalize a date or YYYY-MM-DD string to the string form used as index key"""
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+class DateIndex:
+    """Sorted (date, start_time) index answering range queries in O(log n + k)"""
+    
+    # Sorts after any real start time so range ends are inclusive
+    _MAX = "\uffff"
+    
+    def __init__(self, entries=()):
+        self._keys = sorted(entries)
+    
+    def add(self, day, start_time, ref):
+        """Index ref under the given date and start time"""
+        insort(self._keys, (day, start_time or "", ref))
+    
+    def remove(self, day, start_time, ref):
+        """Drop a previously indexed ref"""
+        key = (day, start_time or "", ref)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+    
+    def between(self, start, end):
+        """Iterate (date, start_time, ref) keys with start <= date <= end"""
+        lo = bisect_left(self._keys, (start,))
+        hi = bisect_right(self._keys, (end, self._MAX))
+        return self._keys[lo:hi]
+    
+    def since(self, start):
+        """Iterate keys dated on or after start, lazily, so a limited read costs O(log n + limit)"""
+        keys = self._keys
+        # islice would step through the first lo keys one by one
+        return (keys[i] for i in range(bisect_left(keys, (start,)), len(keys)))
 
 class Database:
-    def __init__(self, db_path="study_planner.json"):
+    def __init__(self, db_path="study_planner.json", compact_threshold=COMPACT_THRESHOLD):
         self.db_path = db_path
+        self.lock_path = db_path + ".lock"
+        self.compact_threshold = compact_threshold
+        self.changes = ChangeFeed()
+        # _lock guards the in-memory state and is only held briefly; _writer
+        # serializes this process's writers across the file lock, fsyncs and
+        # compactions, so readers never wait for disk I/O
+        self._lock = threading.RLock()
+        self._writer = threading.Lock()
+        self._writing = False
+        self._loading = True
         self.data = self._load_data()
+        self._loading = False
     
     def _load_data(self):
-        """Load data from the JSON file if it exists"""
-        if os.path.exists(self.db_path):
-            try:
-                with open(self.db_path, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return self._create_empty_db()
-        else:
-            return self._create_empty_db()
+        """Load the JSON snapshot if it exists and replay the journal on top of it"""
+        while True:
+            stamp = self._snapshot_stamp()
+            data = self._create_empty_db()
+            if stamp is not None:
+                try:
+                    with open(self.db_path, 'r') as f:
+                        data = json.load(f)
+                except json.JSONDecodeError:
+                    pass
+            # Each compaction starts a new journal generation, so a reader
+            # tailing an old journal can never misread a new one
+            self.generation = data.pop("generation", 0)
+            self.journal_path = self._journal_name(self.generation)
+            # Plan bodies live in a binary side file and are decoded on first use,
+            # so loading costs O(plans) rather than O(tasks)
+            body_file = BodyFile(self._bodies_name(self.generation))
+            # Plans and events are held as insertion-ordered id -> record dicts,
+            # so lookups and deletes are O(1) without disturbing display order
+            data["plans"] = {
+                plan["id"]: (
+                    Plan.from_header(plan, BodyRef(body_file, *plan["body"])) if "body" in plan
+                    else Plan.from_dict(plan)
+                )
+                for plan in data.get("plans", [])
+            }
+            data["calendar_events"] = {event["id"]: event for event in data.get("calendar_events", [])}
+            data["progress"] = {
+                plan_id: _decode_progress(progress) for plan_id, progress in data.get("progress", {}).items()
+            }
+            self.data = data
+            self._progress_history = {}
+            self._rebuild_indexes()
+            self._reset_stats()
+            self._journal_offset = 0
+            self._journal_records = 0
+            self._read_journal()
+            # Another process compacted while we were reading; start over
+            if self._snapshot_stamp() == stamp:
+                self._stamp = stamp
+                return self.data
+    
+    def _snapshot_stamp(self):
+        """Identity of the snapshot file, which changes whenever it is replaced"""
+        try:
+            st = os.stat(self.db_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def _journal_name(self, generation):
+        """Journal file belonging to a snapshot generation"""
+        if generation == 0:
+            return self.db_path + ".journal"
+        return f"{self.db_path}.journal.{generation}"
+    
+    def _bodies_name(self, generation):
+        """Plan body file belonging to a snapshot generation"""
+        return f"{self.db_path}.bodies.{generation}"
     
     def _create_empty_db(self):
         """Create an empty database structure"""
         return {
-            "plans": [],
+            "plans": {},
             "progress": {},
-            "calendar_events": [],
+            "calendar_events": {},
             "user_preferences": {}
         }
     
-    def _save_data(self):
-        """Save data to the JSON file"""
-        with open(self.db_path, 'w') as f:
-            json.dump(self.data, f, indent=2)
+    def export_data(self):
+        """Return the data in its on-disk JSON layout"""
+        return {
+            "plans": [plan.to_dict() for plan in self.data["plans"].values()],
+            "progress": {
+                plan_id: _encode_progress(progress) for plan_id, progress in self.data["progress"].items()
+            },
+            "calendar_events": list(self.data["calendar_events"].values()),
+            "user_preferences": self.data["user_preferences"]
+        }
+    
+    def _rebuild_indexes(self):
+        """Build the event date index; the task date index is built on first use"""
+        self._event_index = DateIndex(
+            (event["date"], event.get("start_time") or "", event_id)
+            for event_id, event in self.data["calendar_events"].items()
+            if event.get("date")
+        )
+        self._task_index = None
+    
+    def _ensure_task_index(self):
+        """Build the date index over dated plan tasks, loading plan bodies"""
+        if self._task_index is None:
+            self._task_index = DateIndex(
+                (task["date"], task.get("start_time") or "", (plan_id, i))
+                for plan_id, plan in self.data["plans"].items()
+                for i, task in enumerate(plan.get("tasks", []))
+                if task.get("date")
+            )
+        return self._task_index
+    
+    def _reset_stats(self):
+        """Drop the aggregates; they are rebuilt when first needed"""
+        self._stats = None
+        self._plan_stats = None
+    
+    def _ensure_stats(self):
+        """Compute the running progress aggregates from scratch, loading plan bodies"""
+        if self._stats is None:
+            self._stats = {"tasks": 0, "completed": 0, "subjects": {}}
+            self._plan_stats = {}
+            for plan_id, plan in self.data["plans"].items():
+                self._tally_plan(plan, self._completed_set(plan_id), 1)
+    
+    def _completed_set(self, plan_id):
+        """Completed task indices recorded for a plan"""
+        progress = self.data["progress"].get(plan_id)
+        return progress["completed"] if progress else set()
+    
+    def _tally_plan(self, plan, completed, sign):
+        """Add (sign=1) or remove (sign=-1) a plan's contribution to the aggregates"""
+        if self._stats is None:
+            return
+        tasks = plan.get("tasks", [])
+        self._stats["tasks"] += sign * len(tasks)
+        subjects = self._stats["subjects"]
+        for task in tasks:
+            subject = task.get("subject")
+            if subject and subject != "Break":
+                counts = subjects.setdefault(subject, {"total": 0, "completed": 0})
+                counts["total"] += sign
+                if counts["total"] == 0:
+                    del subjects[subject]
+        if sign > 0:
+            self._plan_stats[plan["id"]] = {"total_tasks": len(tasks), "completed_tasks": 0}
+        self._tally_completion(plan, completed, sign)
+        if sign < 0:
+            del self._plan_stats[plan["id"]]
+    
+    def _tally_completion(self, plan, indices, sign):
+        """Count tasks of a plan as newly completed (sign=1) or no longer completed (sign=-1)"""
+        if self._stats is None:
+            return
+        tasks = plan.get("tasks", [])
+        subjects = self._stats["subjects"]
+        plan_stats = self._plan_stats[plan["id"]]
+        for i in indices:
+            if not 0 <= i < len(tasks):
+                continue
+            self._stats["completed"] += sign
+            plan_stats["completed_tasks"] += sign
+            subject = tasks[i].get("subject")
+            if subject in subjects:
+                subjects[subject]["completed"] += sign
+    
+    def _index_plan_tasks(self, plan, add=True):
+        """Add or remove the dated tasks of a plan in the task date index"""
+        if self._task_index is None:
+            return
+        update = self._task_index.add if add else self._task_index.remove
+        for i, task in enumerate(plan.get("tasks", [])):
+            if task.get("date"):
+                update(task["date"], task.get("start_time"), (plan["id"], i))
+    
+    def _index_event(self, event, add=True):
+        """Add or remove a calendar event in the event date index"""
+        if event.get("date"):
+            update = self._event_index.add if add else self._event_index.remove
+            update(event["date"], event.get("start_time"), event["id"])
+    
+    def _read_journal(self):
+        """Apply journal records appended since we last read it"""
+        try:
+            if os.path.getsize(self.journal_path) <= self._journal_offset:
+                return
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return
+        for line in chunk.splitlines(keepends=True):
+            # An unterminated last line is still being written (or was torn by a crash)
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            self._apply(record)
+            self._journal_offset += len(line)
+            self._journal_records += 1
+    
+    def _publish(self, kind, key=None):
+        """Notify change subscribers, except while (re)loading record by record"""
+        if not self._loading:
+            self.changes.publish(kind, key)
+    
+    def _refresh(self):
+        """Pick up changes made by other processes without taking the file lock"""
+        if self._snapshot_stamp() != self._stamp:
+            self._loading = True
+            try:
+                self._load_data()
+            finally:
+                self._loading = False
+            self._publish("all")
+        else:
+            self._read_journal()
+    
+    def refresh(self):
+        """Pick up changes made by other processes, publishing them on the change feed"""
+        with self._reading():
+            pass
+    
+    @contextmanager
+    def _reading(self):
+        """Briefly hold the in-process lock with the in-memory data brought up to date"""
+        with self._lock:
+            # While our own writer holds the file lock no other process can
+            # change the files, and the writer applies its records itself
+            if not self._writing:
+                self._refresh()
+            yield
+    
+    @contextmanager
+    def _write_lock(self):
+        """Hold the cross-process writer lock with the in-memory data brought up to date"""
+        with self._writer, open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with self._lock:
+                    self._refresh()
+                    # Nobody else can be appending now, so bytes past our offset are a torn write
+                    if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > self._journal_offset:
+                        with open(self.journal_path, 'r+b') as f:
+                            f.truncate(self._journal_offset)
+                    self._writing = True
+                yield
+            finally:
+                with self._lock:
+                    self._writing = False
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _apply(self, record):
+        """Apply a single journal record to the in-memory data"""
+        op = record["op"]
+        if op == "batch":
+            # Records written as one journal line land together or not at all
+            for item in record["records"]:
+                self._apply(item)
+            return
+        plans = self.data["plans"]
+        events = self.data["calendar_events"]
+        if op == "add_plan":
+            new_plan = Plan.from_dict(record["plan"])
+            completed = self._completed_set(new_plan.id)
+            if new_plan.id in plans:
+                self._index_plan_tasks(plans[new_plan.id], add=False)
+                self._tally_plan(plans[new_plan.id], completed, -1)
+            plans[new_plan.id] = new_plan
+            self._index_plan_tasks(new_plan)
+            self._tally_plan(new_plan, completed, 1)
+            self._publish("plan", new_plan.id)
+        elif op == "update_plan":
+            if record["id"] not in plans:
+                return
+            new_plan = Plan.from_dict(record["plan"])
+            completed = self._completed_set(record["id"])
+            self._index_plan_tasks(plans[record["id"]], add=False)
+            self._tally_plan(plans[record["id"]], completed, -1)
+            self._index_plan_tasks(new_plan)
+            self._tally_plan(new_plan, completed, 1)
+            new_id = new_plan.id
+            if new_id == record["id"]:
+                plans[new_id] = new_plan
+            else:
+                # Re-keying is rare, so rebuild the dict to keep the plan in place
+                self.data["plans"] = {
+                    (new_id if plan_id == record["id"] else plan_id): (new_plan if plan_id == record["id"] else plan)
+                    for plan_id, plan in plans.items()
+                }
+            self._publish("plan", record["id"])
+            if new_id != record["id"]:
+                self._publish("plan", new_id)
+        elif op == "delete_plan":
+            if record["id"] in plans:
+                plan = plans.pop(record["id"])
+                self._index_plan_tasks(plan, add=False)
+                self._tally_plan(plan, self._completed_set(record["id"]), -1)
+            self.data["progress"].pop(record["id"], None)
+            self._progress_history.pop(record["id"], None)
+            self._publish("plan", record["id"])
+            self._publish("progress", record["id"])
+        elif op == "update_progress":
+            progress = _decode_progress(record["progress"])
+            if record["id"] in plans:
+                old = self._completed_set(record["id"])
+                new = progress["completed"]
+                self._tally_completion(plans[record["id"]], old - new, -1)
+                self._tally_completion(plans[record["id"]], new - old, 1)
+            self.data["progress"][record["id"]] = progress
+            self._remember_progress(record["id"], progress)
+            self._publish("progress", record["id"])
+        elif op == "toggle_task":
+            progress = self.data["progress"].get(record["id"])
+            if progress is None:
+                total_tasks = plans[record["id"]].task_count if record["id"] in plans else 0
+                progress = {"completed": set(), "total_tasks": total_tasks, "completion_percentage": 0, "version": 0}
+                self.data["progress"][record["id"]] = progress
+            index = record["index"]
+            if record["completed"] != (index in progress["completed"]):
+                if record["completed"]:
+                    progress["completed"].add(index)
+                else:
+                    progress["completed"].discard(index)
+                if record["id"] in plans:
+                    self._tally_completion(plans[record["id"]], (index,), 1 if record["completed"] else -1)
+            total_tasks = progress["total_tasks"]
+            progress["completion_percentage"] = (len(progress["completed"]) / total_tasks) * 100 if total_tasks else 0
+            # Toggles merge by construction, so unlike full updates they are not
+            # remembered as merge bases; that keeps them O(1)
+            progress["version"] = record["version"]
+            self._publish("progress", record["id"])
+        elif op == "add_event":
+            if record["event"]["id"] in events:
+                self._index_event(events[record["event"]["id"]], add=False)
+            events[record["event"]["id"]] = record["event"]
+            self._index_event(record["event"])
+            self._publish("event", record["event"]["id"])
+        elif op == "delete_event":
+            if record["id"] in events:
+                self._index_event(events.pop(record["id"]), add=False)
+            self._publish("event", record["id"])
+        elif op == "update_preferences":
+            self.data["user_preferences"] = record["preferences"]
+            self._publish("preferences")
+    
+    def _remember_progress(self, plan_id, progress):
+        """Keep the completed set of this progress version for later merges"""
+        history = self._progress_history.setdefault(plan_id, {})
+        history[progress["version"]] = frozenset(progress["completed"])
+        if len(history) > PROGRESS_HISTORY:
+            del history[next(iter(history))]
+    
+    def _commit(self, record):
+        """Apply a mutation in memory and append it to the journal (caller holds the write lock)"""
+        with self._lock:
+            self._apply(record)
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        with open(self.journal_path, 'ab') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            self._journal_offset += len(line)
+            self._journal_records += 1
+        if self._journal_records >= self.compact_threshold:
+            self._compact_locked()
+    
+    def _write_bodies(self, generation):
+        """
+        Write every plan body to a generation's body file.
+        
+        Bodies that were never loaded are copied as raw bytes without decoding.
+        
+        Returns:
+            list: Plan headers pointing at their [offset, length] in the file
+        """
+        headers = []
+        bodies_path = self._bodies_name(generation)
+        with open(bodies_path + ".tmp", 'wb') as f:
+            for plan in self.data["plans"].values():
+                loader = plan.body_loader
+                if isinstance(loader, BodyRef):
+                    body = loader.raw()
+                else:
+                    body = encode_body(plan.tasks, plan.study_techniques, plan.resources)
+                header = plan.header()
+                header["body"] = [f.tell(), len(body)]
+                f.write(body)
+                headers.append(header)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(bodies_path + ".tmp", bodies_path)
+        return headers
+    
+    def _save_data(self, generation):
+        """Atomically write the plan bodies and the JSON snapshot of everything else"""
+        snapshot = {
+            "generation": generation,
+            "plans": self._write_bodies(generation),
+            "progress": {
+                plan_id: _encode_progress(progress) for plan_id, progress in self.data["progress"].items()
+            },
+            "calendar_events": list(self.data["calendar_events"].values()),
+            "user_preferences": self.data["user_preferences"]
+        }
+        tmp_path = self.db_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.db_path)
+    
+    def _compact_locked(self):
+        """
+        Write a new snapshot generation and drop the old journal (caller holds the write lock).
+        
+        Only the writer changes the data while it holds the write lock, so the
+        files are written without blocking readers, and the new generation is
+        swapped in under the in-process lock afterwards.
+        """
+        generation = self.generation + 1
+        self._save_data(generation)
+        with self._lock:
+            self.generation = generation
+            self.journal_path = self._journal_name(generation)
+            self._journal_offset = 0
+            self._journal_records = 0
+            self._stamp = self._snapshot_stamp()
+        self._remove_old_generations()
+    
+    def _remove_old_generations(self):
+        """
+        Delete the journal and body files of earlier generations.
+        
+        The new snapshot already contains every record of the old journals and
+        every body, so a crash before this removal only leaves stale files
+        behind. Open BodyFile handles keep reading removed body files; where
+        the OS refuses to remove an open file (Windows), it is left for the
+        next compaction to retry.
+        """
+        directory, name = os.path.split(os.path.abspath(self.db_path))
+        for entry in os.listdir(directory):
+            if entry == name + ".journal":
+                generation = 0
+            elif entry.startswith((name + ".journal.", name + ".bodies.")):
+                suffix = entry.rsplit(".", 1)[1]
+                if not suffix.isdigit():
+                    continue
+                generation = int(suffix)
+            else:
+                continue
+            if generation < self.generation:
+                try:
+                    os.remove(os.path.join(directory, entry))
+                except OSError:
+                    pass
+    
+    def compact(self):
+        """Fold the journal into the JSON snapshot and start a fresh journal"""
+        with self._write_lock():
+            self._compact_locked()
     
     def get_plans(self):
         """Get all study plans"""
-        return self.data["plans"]
+        with self._reading():
+            return list(self.data["plans"].values())
     
     def get_plan(self, plan_id):
         """Get a specific study plan by ID"""
-        for plan in self.data["plans"]:
-            if plan["id"] == plan_id:
-                return plan
-        return None
+        with self._reading():
+            return self.data["plans"].get(plan_id)
     
     def add_plan(self, plan):
         """Add a new study plan"""
-        self.data["plans"].append(plan)
-        self._save_data()
+        with self._write_lock():
+            self._commit({"op": "add_plan", "plan": as_dict(plan)})
         return plan["id"]
     
-    def update_plan(self, plan_id, updated_plan):
-        """Update an existing study plan"""
-        for i, plan in enumerate(self.data["plans"]):
-            if plan["id"] == plan_id:
-                self.data["plans"][i] = updated_plan
-                self._save_data()
-                return True
-        return False
+    def add_plans(self, plans):
+        """
+        Add many study plans, each with empty progress, in one transaction.
+        
+        The batch is written as a single journal record with a single fsync,
+        so other processes and crash recovery see all of the plans or none.
+        A plan whose id is already stored, or taken earlier in the batch, is
+        skipped rather than overwritten.
+        
+        Returns:
+            list: The id of each plan in order, or None where it was skipped
+        """
+        plans = [as_dict(plan) for plan in plans]
+        plan_ids = []
+        with self._write_lock():
+            records = []
+            for plan in plans:
+                if plan["id"] in self.data["plans"] or plan["id"] in plan_ids:
+                    plan_ids.append(None)
+                    continue
+                progress = {"completed": set(), "total_tasks": len(plan.get("tasks", [])),
+                            "completion_percentage": 0, "version": 1}
+                records.append({"op": "add_plan", "plan": plan})
+                records.append({"op": "update_progress", "id": plan["id"], "progress": _encode_progress(progress)})
+                plan_ids.append(plan["id"])
+            if records:
+                self._commit({"op": "batch", "records": records})
+        return plan_ids
+    
+    def update_plan(self, plan_id, updated_plan, expected_version=None):
+        """
+        Update an existing study plan.
+        
+        If expected_version is given, the update only applies when the stored
+        plan is still at that version, so concurrent editors cannot clobber
+        each other. Returns False when the plan is missing or has moved on.
+        """
+        with self._write_lock():
+            current = self.data["plans"].get(plan_id)
+            if current is None:
+                return False
+            version = current.get("version", 0)
+            if expected_version is not None and expected_version != version:
+                return False
+            plan = dict(as_dict(updated_plan), version=version + 1)
+            self._commit({"op": "update_plan", "id": plan_id, "plan": plan})
+        return True
     
     def delete_plan(self, plan_id):
         """Delete a study plan"""
-        for i, plan in enumerate(self.data["plans"]):
-            if plan["id"] == plan_id:
-                del self.data["plans"][i]
-                if plan_id in self.data["progress"]:
-                    del self.data["progress"][plan_id]
-                self._save_data()
-                return True
-        return False
+        with self._write_lock():
+            if plan_id not in self.data["plans"]:
+                return False
+            self._commit({"op": "delete_plan", "id": plan_id})
+        return True
     
     def get_progress(self, plan_id):
         """Get progress for a specific plan"""
-        return self.data["progress"].get(plan_id, {
-            "completed_tasks": [],
-            "total_tasks": 0,
-            "completion_percentage": 0
-        })
+        with self._reading():
+            progress = self.data["progress"].get(plan_id)
+            if progress is None:
+                return {
+                    "completed_tasks": [],
+                    "total_tasks": 0,
+                    "completion_percentage": 0
+                }
+            return {
+                "completed_tasks": sorted(progress["completed"]),
+                "total_tasks": progress["total_tasks"],
+                "completion_percentage": progress["completion_percentage"],
+                "version": progress["version"]
+            }
+    
+    def is_completed(self, plan_id, task_index):
+        """Check whether a task of a plan is completed"""
+        with self._reading():
+            return task_index in self._completed_set(plan_id)
+    
+    def count(self, plan_id):
+        """Get the number of completed tasks of a plan"""
+        with self._reading():
+            return len(self._completed_set(plan_id))
+    
+    def toggle(self, plan_id, task_index, completed=None):
+        """
+        Mark a single task completed or not (flip it when completed is None).
+        
+        Only this task's state is journaled, so concurrent toggles of other
+        tasks by other sessions are never overwritten. Returns the new state.
+        """
+        with self._write_lock():
+            progress = self.data["progress"].get(plan_id)
+            if completed is None:
+                completed = task_index not in self._completed_set(plan_id)
+            version = progress["version"] if progress else 0
+            self._commit({
+                "op": "toggle_task",
+                "id": plan_id,
+                "index": task_index,
+                "completed": bool(completed),
+                "version": version + 1
+            })
+        return bool(completed)
+    
+    def set_completed(self, plan_id, changes):
+        """
+        Apply many task completion changes ({task index: completed}) as one delta.
+        
+        Like toggle, only the given tasks are journaled, so other sessions'
+        ticks are kept; the whole delta is a single journal record and fsync.
+        Returns the progress as stored.
+        """
+        if changes:
+            with self._write_lock():
+                progress = self.data["progress"].get(plan_id)
+                version = (progress["version"] if progress else 0) + 1
+                self._commit({"op": "batch", "records": [
+                    {"op": "toggle_task", "id": plan_id, "index": index, "completed": bool(completed), "version": version}
+                    for index, completed in sorted(changes.items())
+                ]})
+        return self.get_progress(plan_id)
+    
+    def _merge_progress(self, plan_id, progress, current):
+        """Three-way merge of a progress update based on an older version into the current one"""
+        mine = set(progress.get("completed_tasks", []))
+        latest = current["completed"]
+        base = self._progress_history.get(plan_id, {}).get(progress["version"])
+        merged = _merge_completed(latest, mine, base)
+        total_tasks = progress.get("total_tasks") or current["total_tasks"]
+        return {
+            "completed_tasks": sorted(merged),
+            "total_tasks": total_tasks,
+            "completion_percentage": (len(merged) / total_tasks) * 100 if total_tasks else 0
+        }
     
     def update_progress(self, plan_id, progress):
-        """Update progress for a specific plan"""
-        self.data["progress"][plan_id] = progress
-        self._save_data()
+        """
+        Update progress for a specific plan.
+        
+        Progress read through get_progress carries a version. If another
+        session has saved since then, the two sets of ticked and unticked
+        tasks are merged instead of the later write replacing the earlier.
+        Returns the progress as stored.
+        """
+        with self._write_lock():
+            current = self.data["progress"].get(plan_id)
+            version = current["version"] if current else 0
+            if current and progress.get("version") is not None and progress["version"] != version:
+                progress = self._merge_progress(plan_id, progress, current)
+            progress = _decode_progress(dict(progress, version=version + 1))
+            self._commit({"op": "update_progress", "id": plan_id, "progress": _encode_progress(progress)})
+        return self.get_progress(plan_id)
     
     def get_calendar_events(self):
         """Get all calendar events"""
-        return self.data["calendar_events"]
+        with self._reading():
+            return list(self.data["calendar_events"].values())
     
     def add_calendar_event(self, event):
         """Add a new calendar event"""
-        self.data["calendar_events"].append(event)
-        self._save_data()
+        with self._write_lock():
+            self._commit({"op": "add_event", "event": event})
         return event["id"]
     
     def delete_calendar_event(self, event_id):
         """Delete a calendar event"""
-        for i, event in enumerate(self.data["calendar_events"]):
-            if event["id"] == event_id:
-                del self.data["calendar_events"][i]
-                self._save_data()
-                return True
-        return False
+        with self._write_lock():
+            if event_id not in self.data["calendar_events"]:
+                return False
+            self._commit({"op": "delete_event", "id": event_id})
+        return True
+    
+    def get_plan_stats(self, plan_id):
+        """Get the task and completed-task counts of a plan"""
+        with self._reading():
+            if self._plan_stats is not None:
+                return dict(self._plan_stats.get(plan_id, {"total_tasks": 0, "completed_tasks": 0}))
+            # Aggregates not built yet: answer from the plan header without loading tasks
+            plan = self.data["plans"].get(plan_id)
+            if plan is None:
+                return {"total_tasks": 0, "completed_tasks": 0}
+            total_tasks = plan.task_count
+            completed = sum(1 for i in self._completed_set(plan_id) if 0 <= i < total_tasks)
+            return {"total_tasks": total_tasks, "completed_tasks": completed}
+    
+    def get_insights(self):
+        """
+        Get the running progress aggregates used by the Insights page.
+        
+        The numbers are maintained as plans and progress change, so this
+        costs the same no matter how many plans or tasks exist.
+        """
+        with self._reading():
+            self._ensure_stats()
+            total_tasks = self._stats["tasks"]
+            completed_tasks = self._stats["completed"]
+            return {
+                "total_plans": len(self.data["plans"]),
+                "total_tasks": total_tasks,
+                "completed_tasks": completed_tasks,
+                "completion_rate": (completed_tasks / total_tasks) * 100 if total_tasks > 0 else 0,
+                "subjects": {subject: dict(counts) for subject, counts in self._stats["subjects"].items()}
+            }
+    
+    def _task_entry(self, ref):
+        """Calendar-style view of an indexed plan task"""
+        plan_id, i = ref
+        task = self.data["plans"][plan_id]["tasks"][i]
+        entry = dict(task)
+        entry.update({
+            "id": f"{plan_id}:{i}",
+            "title": f"{task.get('subject', '')}: {task.get('description', '')}",
+            "plan_id": plan_id,
+            "task_index": i
+        })
+        return entry
+    
+    def _resolve(self, keys, include_tasks, task_keys):
+        """Turn index keys into records, merging in plan tasks when requested"""
+        if include_tasks:
+            keys = heapq.merge(
+                ((day, start, 0, ref) for day, start, ref in keys),
+                ((day, start, 1, ref) for day, start, ref in task_keys)
+            )
+            for _, _, is_task, ref in keys:
+                yield self._task_entry(ref) if is_task else self.data["calendar_events"][ref]
+        else:
+            for _, _, ref in keys:
+                yield self.data["calendar_events"][ref]
+    
+    def events_between(self, start, end, include_tasks=False):
+        """Get calendar events (and optionally dated plan tasks) from start to end inclusive, in date order"""
+        with self._reading():
+            start, end = _date_key(start), _date_key(end)
+            return list(self._resolve(
+                self._event_index.between(start, end),
+                include_tasks,
+                self._ensure_task_index().between(start, end) if include_tasks else ()
+            ))
+    
+    def upcoming(self, limit=None, today=None, include_tasks=False):
+        """Get calendar events (and optionally dated plan tasks) from today onwards, in date order"""
+        with self._reading():
+            today = _date_key(today or datetime.now().date())
+            entries = self._resolve(
+                self._event_index.since(today),
+                include_tasks,
+                self._ensure_task_index().since(today) if include_tasks else ()
+            )
+            return list(islice(entries, limit))
     
     def get_user_preferences(self):
         """Get user preferences"""
-        return self.data["user_preferences"]
+        with self._reading():
+            return self.data["user_preferences"]
     
     def update_user_preferences(self, preferences):
         """Update user preferences"""
-        self.data["user_preferences"] = preferences
-        self._save_data()
+        with self._write_lock():
+            self._commit({"op": "update_preferences", "preferences": preferences})
     
     def clear_all_data(self):
         """Clear all data"""
-        self.data = self._create_empty_db()
-        self._save_data()
+        with self._write_lock():
+            with self._lock:
+                self.data = self._create_empty_db()
+                self._progress_history = {}
+                self._rebuild_indexes()
+                self._reset_stats()
+            self._compact_locked()
+            self._publish("all")
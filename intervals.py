@@ -0,0 +1,154 @@
+# Busy-interval index for conflict detection and free-slot search
+#
+# Intervals are bucketed by date and kept sorted by start minute. Each day
+# also remembers its longest interval, so every interval that can overlap a
+# query starts within [query start - longest, query end) and is found with
+# two bisections: O(log n + k) per query however many months of events the
+# index holds. A day's merged busy time is cached until the next add to that
+# day, so repeated free-slot searches bisect into it instead of re-merging.
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+
+from models import time_to_minutes
+
+# Whole day, in minutes since midnight
+DAY = (0, 24 * 60)
+
+def _day_key(day):
+    """Normalize a date/datetime/string to the YYYY-MM-DD key used by the index"""
+    if isinstance(day, (date, datetime)):
+        return day.strftime("%Y-%m-%d")
+    return day
+
+def _merge(intervals):
+    """Merge sorted (start, end) pairs into disjoint [start, end] intervals"""
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def _is_plan_task(ref):
+    """Whether an indexed entry is a stored plan's task rather than a calendar event"""
+    return isinstance(ref, dict) and "plan_id" in ref
+
+def _minutes(value):
+    """Accept HH:MM strings, datetime.time objects or minute counts"""
+    if hasattr(value, "hour"):
+        return value.hour * 60 + value.minute
+    return time_to_minutes(value)
+
+class BusyIndex:
+    """Busy intervals (calendar events, dated plan tasks) keyed by date and minute of day"""
+
+    def __init__(self, entries=()):
+        # date -> sorted [(start, end, position)], with refs stored separately
+        # so entries never compare the (possibly unorderable) refs
+        self._days = {}
+        self._longest = {}
+        self._refs = []
+        # date -> (merged [(start, end)], their ends), dropped when the day changes
+        self._merged = {}
+        for entry in entries:
+            self.add_entry(entry)
+
+    def add(self, day, start, end, ref=None):
+        """Record [start, end) on a day as busy"""
+        day = _day_key(day)
+        start, end = _minutes(start), _minutes(end)
+        if end <= start:
+            return
+        self._refs.append(ref)
+        insort(self._days.setdefault(day, []), (start, end, len(self._refs) - 1))
+        self._longest[day] = max(self._longest.get(day, 0), end - start)
+        self._merged.pop(day, None)
+
+    def add_entry(self, entry):
+        """Index a calendar event or task entry dict; entries without both times are skipped"""
+        if entry.get("date") and entry.get("start_time") and entry.get("end_time"):
+            self.add(entry["date"], entry["start_time"], entry["end_time"], entry)
+
+    def conflicts(self, day, start, end):
+        """
+        Get everything overlapping [start, end) on a day.
+
+        Returns:
+            list: (start, end, ref) tuples sorted by start
+        """
+        day = _day_key(day)
+        intervals = self._days.get(day)
+        if not intervals:
+            return []
+        start, end = _minutes(start), _minutes(end)
+        lo = bisect_left(intervals, (start - self._longest[day] + 1,))
+        hi = bisect_left(intervals, (end,))
+        return [
+            (s, e, self._refs[position])
+            for s, e, position in intervals[lo:hi]
+            if e > start
+        ]
+
+    def _merged_day(self, day):
+        """Cached merged busy intervals of a day and the list of their ends"""
+        cached = self._merged.get(day)
+        if cached is None:
+            merged = [(start, end) for start, end in _merge((s, e) for s, e, _ in self._days.get(day, ()))]
+            cached = self._merged[day] = (merged, [end for _, end in merged])
+        return cached
+
+    def merged(self, day):
+        """Busy time of a day as merged [start, end] intervals"""
+        return [[start, end] for start, end in self._merged_day(_day_key(day))[0]]
+
+    def free_slots(self, day, min_len, windows=(DAY,)):
+        """
+        Get the free gaps of at least min_len minutes within the given windows.
+
+        Each window costs O(log n + k) for the k busy intervals inside it.
+
+        Returns:
+            list: (start, end) minute pairs in order
+        """
+        busy, ends = self._merged_day(_day_key(day))
+        slots = []
+        for start, end in sorted((_minutes(s), _minutes(e)) for s, e in windows):
+            # First busy interval still running after the window opens
+            j = bisect_right(ends, start)
+            while j < len(busy) and busy[j][0] < end:
+                if busy[j][0] - start >= min_len:
+                    slots.append((start, busy[j][0]))
+                start = max(start, busy[j][1])
+                j += 1
+            if end - start >= min_len:
+                slots.append((start, end))
+        return slots
+
+    def fingerprint(self, include_tasks=True):
+        """
+        Merged busy time of every day, for comparing indexes by content.
+
+        With include_tasks=False, stored plans' tasks are left out, so the
+        fingerprint only changes with the calendar events.
+        """
+        if include_tasks:
+            return [[day, self.merged(day)] for day in sorted(self._days)]
+        fingerprint = []
+        for day in sorted(self._days):
+            merged = _merge(
+                (start, end) for start, end, position in self._days[day]
+                if not _is_plan_task(self._refs[position])
+            )
+            if merged:
+                fingerprint.append([day, merged])
+        return fingerprint
+
+    @classmethod
+    def from_database(cls, db, start, end, exclude_plan=None):
+        """Index the calendar events and dated plan tasks between two dates (inclusive)"""
+        return cls(
+            entry for entry in db.events_between(start, end, include_tasks=True)
+            if exclude_plan is None or entry.get("plan_id") != exclude_plan
+        )
@@ -0,0 +1,223 @@
+# Compact record types for study plans and their tasks
+
+import sys
+import threading
+
+# Guards installing a lazily loaded plan body. It is never held while the
+# loader runs, since loaders take their store's lock and store methods in
+# turn read plan bodies.
+_load_lock = threading.Lock()
+
+def time_to_minutes(value):
+    """Convert an HH:MM string (or minute count) to minutes since midnight"""
+    if value is None or isinstance(value, int):
+        return value
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def minutes_to_time(minutes):
+    """Convert minutes since midnight to an HH:MM string"""
+    if minutes is None:
+        return None
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def _intern(value):
+    """Intern short repeated strings such as subjects, priorities and dates"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+def as_dict(record):
+    """Convert a Task/Plan to its plain dict form; dicts pass through unchanged"""
+    return record.to_dict() if isinstance(record, _Record) else record
+
+class _Record:
+    """
+    Read-only mapping view over a slotted record.
+
+    Lets records be used wherever the app previously handled dicts
+    (record['subject'], 'priority' in record, record.get('date')).
+    Unset (None) fields behave as missing keys.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
+    def _field(self, key):
+        return getattr(self, key)
+
+    def keys(self):
+        keys = [key for key in self.FIELDS if self._field(key) is not None]
+        if self.extra:
+            keys.extend(self.extra)
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = self._field(key)
+        else:
+            value = (self.extra or {}).get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class Task(_Record):
+    """A single scheduled task; times are stored as minutes since midnight"""
+    __slots__ = ("id", "subject", "description", "date", "start", "end", "type", "priority", "extra")
+    FIELDS = ("id", "subject", "description", "date", "start_time", "end_time", "type", "priority")
+
+    def __init__(self, id, subject, description, start_time=None, end_time=None, type=None,
+                 priority=None, date=None, extra=None):
+        self.id = id
+        self.subject = _intern(subject)
+        self.description = description
+        self.date = _intern(date)
+        self.start = time_to_minutes(start_time)
+        self.end = time_to_minutes(end_time)
+        self.type = _intern(type)
+        self.priority = _intern(priority)
+        self.extra = extra or None
+
+    def _field(self, key):
+        if key == "start_time":
+            return minutes_to_time(self.start)
+        if key == "end_time":
+            return minutes_to_time(self.end)
+        return getattr(self, key)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Task from its stored dict form"""
+        if isinstance(data, Task):
+            return data
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        return cls(
+            data.get("id"), data.get("subject"), data.get("description"),
+            data.get("start_time"), data.get("end_time"), data.get("type"),
+            data.get("priority"), data.get("date"), extra
+        )
+
+class Plan(_Record):
+    """
+    A study plan holding its tasks as Task records.
+
+    A plan read from storage may arrive as a header only, with a loader
+    that fetches its tasks, study techniques and resources on first
+    access. Listing plans therefore never decodes task bodies.
+    """
+    __slots__ = ("id", "type", "created_at", "exam_date", "_tasks", "_study_techniques",
+                 "_resources", "version", "extra", "_loader", "_task_count")
+    FIELDS = ("id", "type", "created_at", "exam_date", "tasks", "study_techniques", "resources", "version")
+    HEADER_FIELDS = ("id", "type", "created_at", "exam_date", "version")
+
+    def __init__(self, id, type, created_at, tasks, study_techniques=None, resources=None,
+                 exam_date=None, version=None, extra=None):
+        self.id = id
+        self.type = _intern(type)
+        self.created_at = created_at
+        self.exam_date = exam_date
+        self._tasks = tasks
+        self._study_techniques = study_techniques if study_techniques is not None else []
+        self._resources = resources if resources is not None else []
+        self.version = version
+        self.extra = extra or None
+        self._loader = None
+        self._task_count = None
+
+    def _load(self):
+        """Fetch the body of a header-only plan"""
+        loader = self._loader
+        if loader is None:
+            return
+        # Threads racing here may both load; only the first body is kept
+        body = loader()
+        with _load_lock:
+            if self._loader is loader:
+                self._tasks, self._study_techniques, self._resources = body
+                self._loader = None
+
+    @property
+    def tasks(self):
+        self._load()
+        return self._tasks
+
+    @property
+    def study_techniques(self):
+        self._load()
+        return self._study_techniques
+
+    @property
+    def resources(self):
+        self._load()
+        return self._resources
+
+    @property
+    def loaded(self):
+        """Whether the tasks, techniques and resources are in memory"""
+        return self._loader is None
+
+    @property
+    def body_loader(self):
+        """The pending body loader of a header-only plan, else None"""
+        return self._loader
+
+    @property
+    def task_count(self):
+        """Number of tasks, known without loading the body"""
+        if self._loader is None:
+            return len(self._tasks)
+        return self._task_count
+
+    def to_dict(self):
+        data = super().to_dict()
+        data["tasks"] = [task.to_dict() for task in self.tasks]
+        return data
+
+    def header(self):
+        """Plan fields other than the body, as stored in the snapshot"""
+        data = {key: getattr(self, key) for key in self.HEADER_FIELDS if getattr(self, key) is not None}
+        data["task_count"] = self.task_count
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_header(cls, header, loader):
+        """Build a header-only Plan whose body comes from loader() -> (tasks, techniques, resources)"""
+        extra = {key: value for key, value in header.items()
+                 if key not in cls.HEADER_FIELDS and key not in ("task_count", "body")}
+        plan = cls(
+            header.get("id"), header.get("type"), header.get("created_at"), None,
+            exam_date=header.get("exam_date"), version=header.get("version"), extra=extra
+        )
+        plan._loader = loader
+        plan._task_count = header.get("task_count", 0)
+        return plan
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Plan from its stored dict form"""
+        if isinstance(data, Plan):
+            return data
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        return cls(
+            data.get("id"), data.get("type"), data.get("created_at"),
+            [Task.from_dict(task) for task in data.get("tasks", [])],
+            data.get("study_techniques"), data.get("resources"),
+            data.get("exam_date"), data.get("version"), extra
+        )
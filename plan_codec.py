@@ -0,0 +1,150 @@
+# Columnar binary encoding for plan bodies (tasks, study techniques, resources)
+#
+# Layout of one encoded body:
+#   MAGIC | uint32 metadata length | metadata JSON | one little-endian column per task field
+# The metadata holds the task count, a de-duplicated string table, the
+# study techniques and resources, and any task keys the columns do not cover.
+
+import json
+import os
+import struct
+import sys
+import threading
+from array import array
+
+from models import Task
+
+MAGIC = b"SPB1"
+
+# Marks a missing value in every column
+NONE = -1
+
+# (field, array typecode); string fields hold indexes into the string table
+COLUMNS = (
+    ("id", "i"),
+    ("subject", "i"),
+    ("description", "i"),
+    ("date", "i"),
+    ("start", "h"),
+    ("end", "h"),
+    ("type", "i"),
+    ("priority", "i"),
+)
+STRING_FIELDS = ("subject", "description", "date", "type", "priority")
+
+def _to_bytes(column):
+    """Serialize an array in little-endian byte order"""
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+def encode_body(tasks, study_techniques, resources):
+    """Encode a plan's tasks, techniques and resources into a compact binary body"""
+    strings = {}
+    columns = {field: array(typecode) for field, typecode in COLUMNS}
+    extra = {}
+    for i, task in enumerate(tasks):
+        task = Task.from_dict(task)
+        if isinstance(task.id, int) and 0 <= task.id < 2 ** 31:
+            columns["id"].append(task.id)
+        else:
+            columns["id"].append(NONE)
+            if task.id is not None:
+                extra.setdefault(str(i), {})["id"] = task.id
+        for field in STRING_FIELDS:
+            value = getattr(task, field)
+            columns[field].append(NONE if value is None else strings.setdefault(value, len(strings)))
+        columns["start"].append(NONE if task.start is None else task.start)
+        columns["end"].append(NONE if task.end is None else task.end)
+        if task.extra:
+            extra.setdefault(str(i), {}).update(task.extra)
+    meta = json.dumps({
+        "count": len(tasks),
+        "strings": list(strings),
+        "study_techniques": study_techniques,
+        "resources": resources,
+        "extra": extra
+    }, separators=(",", ":")).encode()
+    return b"".join(
+        [MAGIC, struct.pack("<I", len(meta)), meta]
+        + [_to_bytes(columns[field]) for field, _ in COLUMNS]
+    )
+
+def decode_body(data):
+    """
+    Decode a body produced by encode_body.
+
+    Returns:
+        tuple: (list of Task, study techniques, resources)
+    """
+    if data[:4] != MAGIC:
+        raise ValueError("Not an encoded plan body")
+    (meta_length,) = struct.unpack_from("<I", data, 4)
+    offset = 8 + meta_length
+    meta = json.loads(data[8:offset])
+    count = meta["count"]
+    columns = {}
+    for field, typecode in COLUMNS:
+        column = array(typecode)
+        size = column.itemsize * count
+        column.frombytes(data[offset:offset + size])
+        if sys.byteorder != "little":
+            column.byteswap()
+        columns[field] = column
+        offset += size
+    strings = meta["strings"]
+
+    def string(field, i):
+        index = columns[field][i]
+        return None if index == NONE else strings[index]
+
+    def number(field, i):
+        value = columns[field][i]
+        return None if value == NONE else value
+
+    extra = meta["extra"]
+    tasks = []
+    for i in range(count):
+        task_extra = dict(extra.get(str(i), {}))
+        task_id = task_extra.pop("id", number("id", i))
+        tasks.append(Task(
+            task_id, string("subject", i), string("description", i),
+            number("start", i), number("end", i), string("type", i),
+            string("priority", i), string("date", i), task_extra
+        ))
+    return tasks, meta["study_techniques"], meta["resources"]
+
+class BodyFile:
+    """
+    Read-only handle on a file of concatenated plan bodies.
+
+    The file is opened once and kept open, so bodies stay readable after a
+    compaction replaces or removes it on disk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb') if os.path.exists(path) else None
+        self._lock = threading.Lock()
+
+    def read(self, offset, length):
+        """Read the raw bytes of one body"""
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length)
+
+class BodyRef:
+    """Loader for one plan body stored in a BodyFile"""
+    __slots__ = ("body_file", "offset", "length")
+
+    def __init__(self, body_file, offset, length):
+        self.body_file = body_file
+        self.offset = offset
+        self.length = length
+
+    def raw(self):
+        """The encoded body bytes, for copying without decoding"""
+        return self.body_file.read(self.offset, self.length)
+
+    def __call__(self):
+        return decode_body(self.raw())
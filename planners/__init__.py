@@ -0,0 +1,16 @@
+# Plan generators behind a registry keyed by plan type
+#
+# Importing this package registers the built-in planners. Nothing here
+# imports Streamlit, so batch jobs, tests and benchmarks can generate plans
+# headlessly:
+#   from planners import generate_plan
+#   plan = generate_plan("exam_time", {"subjects": ["Math"], "exam_date": "2026-11-20"})
+
+from planners.cache import PlanCache, plan_cache
+from planners.context import CounterIds, GenerationContext, ulid
+from planners.registry import Planner, generate_plan, get_planner, planner_names, register_planner
+from planners.schemas import ExamTimeInputs, Field, QuickStudyInputs, Schema, SubmissionsInputs
+from planners.quick_study import generate_quick_study_plan
+from planners.exam_time import generate_exam_time_plan
+from planners.submissions import generate_submissions_plan
+from planners.replan import replan
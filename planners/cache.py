@@ -0,0 +1,120 @@
+# Content-addressed cache in front of the planners
+#
+# Regenerating a plan from the same inputs on the same day yields the same
+# sessions, so the result is cached under a hash of the planner name, the
+# normalized inputs, the generation date and RNG seed. A hit returns a copy
+# with an id and creation time freshly minted by the caller's context.
+# Busy time is keyed by its calendar events only: stored plans' sessions are
+# left out, so an accidental resubmit after the first plan was saved still
+# hits, at the cost of not reacting to edits of other plans.
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time
+
+from intervals import BusyIndex
+from models import Plan
+from planners.context import GenerationContext
+
+# Plans kept by the default cache
+CACHE_SIZE = 256
+
+# Free-text inputs the generators parse line by line, stripping every line,
+# so whitespace around those lines cannot change a plan. Other strings, such
+# as subject names, are used verbatim and keyed as given.
+LINE_FIELDS = ("special_events", "priority_settings")
+
+def _strip_lines(text):
+    return "\n".join(line.strip() for line in text.strip().splitlines())
+
+def _normalize(value):
+    """Reduce an input value to a JSON-serializable canonical form"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, BusyIndex):
+        # Saving a plan adds its sessions to the busy time of the next
+        # request, so keying on them would make every resubmit miss
+        return value.fingerprint(include_tasks=False)
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+def cache_key(planner_name, kwargs, context):
+    """Canonical SHA-256 of a planner call"""
+    canonical = {
+        "planner": planner_name,
+        "today": context.today().isoformat(),
+        "seed": context.seed,
+        "inputs": _normalize({
+            key: _strip_lines(value) if key in LINE_FIELDS and isinstance(value, str) else value
+            for key, value in kwargs.items() if key != "context"
+        })
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _copy(plan, plan_id, created_at):
+    """Copy a cached plan under a given id and creation time; Task records are shared, never mutated"""
+    return Plan(
+        plan_id, plan.type, created_at,
+        list(plan.tasks), list(plan.study_techniques), list(plan.resources),
+        plan.exam_date, plan.version, dict(plan.extra) if plan.extra else None
+    )
+
+class PlanCache:
+    """LRU cache of generated plans with a size cap and hit/miss counters"""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_generate(self, planner_name, kwargs, generate):
+        """Return a cached copy of the plan for these inputs, generating it on a miss"""
+        context = kwargs.get("context") or GenerationContext()
+        kwargs = dict(kwargs, context=context)
+        key = cache_key(planner_name, kwargs, context)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return _copy(plan, context.new_id(), context.now().strftime("%Y-%m-%d %H:%M"))
+            self.misses += 1
+        plan = generate(**kwargs)
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+                self.evictions += 1
+        return _copy(plan, plan.id, plan.created_at)
+
+    def stats(self):
+        """Counters and current size"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._plans),
+                "maxsize": self.maxsize
+            }
+
+    def clear(self):
+        """Drop every cached plan and reset the counters"""
+        with self._lock:
+            self._plans.clear()
+            self.hits = self.misses = self.evictions = 0
+
+# Shared by generate_plan unless a caller opts out
+plan_cache = PlanCache()
@@ -0,0 +1,29 @@
+# Helpers shared by the planners
+
+from intervals import BusyIndex
+from special_events import parse_special_events
+
+# Generated plans aim for at least this many sessions
+MIN_PLAN_TASKS = 8
+
+def parse_priorities(priority_settings):
+    """Parse 'Item: Priority' lines into a dict"""
+    priorities = {}
+    if priority_settings:
+        for line in priority_settings.split('\n'):
+            if ':' in line:
+                item, priority = line.split(':', 1)
+                priorities[item.strip()] = priority.strip()
+    return priorities
+
+def block_special_events(special_events, busy, today):
+    """Add the parsed special events to the busy index so no session lands on them"""
+    blocked, _ = parse_special_events(special_events, today)
+    busy = busy if busy is not None else BusyIndex()
+    for interval in blocked:
+        busy.add(interval.date, interval.start, interval.end, interval)
+    return busy
+
+def session_length(capacity, limit, count=MIN_PLAN_TASKS):
+    """Session length that yields about `count` sessions from the capacity, within 30 minutes and `limit`"""
+    return max(30, min(limit, capacity // max(1, count)) // 5 * 5)
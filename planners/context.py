@@ -0,0 +1,79 @@
+# Randomness, clock and id source used by the planners
+#
+# Generators never call random, datetime.now() or mint ids directly; they
+# ask a GenerationContext. The default context behaves like the live app
+# (system RNG, wall clock, ULID ids), while GenerationContext.deterministic()
+# pins all three so benchmarks and tests produce identical plans run after run.
+
+import itertools
+import os
+import random
+import threading
+from datetime import datetime, time
+
+# Crockford base32, as used by ULIDs
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+def ulid(now=None):
+    """
+    26-character ULID: 48-bit millisecond timestamp plus 80 random bits.
+
+    Ids sort by creation time and are unique across processes without any
+    coordination.
+    """
+    milliseconds = int((now or datetime.now()).timestamp() * 1000)
+    value = (milliseconds << 80) | int.from_bytes(os.urandom(10), "big")
+    chars = []
+    for _ in range(26):
+        chars.append(CROCKFORD[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def ulid_plan_id():
+    """Default plan id factory"""
+    return f"plan_{ulid()}"
+
+class CounterIds:
+    """Plan id factory yielding plan_<prefix>000001, plan_<prefix>000002, ..."""
+
+    def __init__(self, prefix="", start=1):
+        self.prefix = prefix
+        self._counter = itertools.count(start)
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            return f"plan_{self.prefix}{next(self._counter):06d}"
+
+class GenerationContext:
+    """Source of randomness, the current time and new plan ids for one generation"""
+    __slots__ = ("rng", "seed", "clock", "new_id", "_today")
+
+    def __init__(self, rng=None, today=None, clock=None, new_id=None, seed=None):
+        self.seed = seed
+        self.rng = rng or (random.Random(seed) if seed is not None else random.Random())
+        self.clock = clock or datetime.now
+        self.new_id = new_id or ulid_plan_id
+        self._today = today
+
+    def now(self):
+        return self.clock()
+
+    def today(self):
+        """The date plans are generated for; fixed if the context was given one"""
+        return self._today or self.clock().date()
+
+    @classmethod
+    def deterministic(cls, seed=0, today=None, id_prefix=""):
+        """
+        Context with a seeded RNG, a frozen clock and counter ids.
+
+        The clock stands at midnight of `today` (default: the real current
+        date), so created_at stamps are stable too.
+        """
+        today = today or datetime.now().date()
+        frozen = datetime.combine(today, time())
+        return cls(
+            rng=random.Random(seed), today=today, clock=lambda: frozen,
+            new_id=CounterIds(id_prefix), seed=seed
+        )
@@ -0,0 +1,86 @@
+# Exam Time planner: subjects interleaved over the days before an exam
+
+from datetime import timedelta
+
+from ai import generate_resource_recommendations, generate_study_technique
+from models import Plan, Task
+from planners.common import block_special_events, parse_priorities, session_length
+from planners.context import GenerationContext
+from planners.registry import register_planner
+from planners.schemas import ExamTimeInputs
+from scheduler import Demand, Timeline, preferred_windows
+from utils import calculate_study_distribution
+
+@register_planner("exam_time", ExamTimeInputs, aliases=("exam", "Exam Time"))
+def generate_exam_time_plan(subjects, exam_date, daily_hours, difficulty_dict, 
+                          preferred_time, special_events, learning_style, priority_settings, busy=None,
+                          context=None):
+    # In a real app, this would use AI to generate a personalized plan
+    # For this example, we'll create a simulated plan
+    
+    context = context or GenerationContext()
+    plan_id = context.new_id()
+    
+    priorities = parse_priorities(priority_settings)
+    
+    # Study every day up to the exam, skipping weekends unless that leaves no days
+    today = context.today()
+    last_day = max(today, exam_date - timedelta(days=1))
+    busy = block_special_events(special_events, busy, today)
+    windows = preferred_windows(preferred_time)
+    timeline = Timeline(today, last_day, windows, daily_limit=daily_hours * 60,
+                        skip_weekends="Weekend" not in preferred_time, busy=busy)
+    if not timeline.days:
+        timeline = Timeline(today, last_day, windows, daily_limit=daily_hours * 60, busy=busy)
+    capacity = timeline.capacity()
+    
+    # Sessions short enough to fit several subjects into a day
+    session = session_length(capacity, min(180, max(60, daily_hours * 60 // max(1, len(subjects)))))
+    
+    # Share the available sessions by difficulty and priority, at least one each
+    subject_priorities = {subject: priorities.get(subject, "Medium") for subject in subjects}
+    distribution = calculate_study_distribution(subjects, capacity // session, difficulty_dict, subject_priorities)
+    demands = [
+        Demand(subject, distribution[subject] * session,
+               deadline=max(exam_date, today + timedelta(days=1)),
+               priority=subject_priorities[subject], session=session)
+        for subject in subjects
+    ]
+    sessions = timeline.schedule(demands)
+    
+    # Every third session of a subject is a recap
+    descriptions = ("Read and understand {} concepts", "Practice problems on {}", "Review and summarize {}")
+    session_counts = {}
+    tasks = []
+    for demand, day, start, end in sessions:
+        count = session_counts.get(demand.key, 0)
+        session_counts[demand.key] = count + 1
+        tasks.append(Task(
+            id=len(tasks),
+            subject=demand.key,
+            description=descriptions[count % 3].format(demand.key),
+            date=day.strftime("%Y-%m-%d"),
+            start_time=start,
+            end_time=end,
+            type='review' if count % 3 == 2 else 'study',
+            priority=demand.priority
+        ))
+    
+    # Generate study techniques based on learning style
+    study_techniques = generate_study_technique(learning_style)
+    
+    # Generate resource recommendations
+    resources = generate_resource_recommendations(subjects, learning_style)
+    
+    # Create the plan
+    plan = Plan(
+        id=plan_id,
+        type='Exam Time',
+        created_at=context.now().strftime("%Y-%m-%d %H:%M"),
+        exam_date=exam_date.strftime("%Y-%m-%d"),
+        tasks=tasks,
+        study_techniques=study_techniques,
+        resources=resources
+    )
+    
+    return plan
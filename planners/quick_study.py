@@ -0,0 +1,120 @@
+# Quick Study planner: short sessions with breaks over the next few days
+
+from datetime import timedelta
+
+from ai import generate_resource_recommendations, generate_study_technique
+from models import Plan, Task
+from planners.common import block_special_events, parse_priorities
+from planners.context import GenerationContext
+from planners.registry import register_planner
+from planners.schemas import QuickStudyInputs
+from scheduler import Demand, Timeline
+
+# Overflow rolls onto later days, but never further ahead than this
+MAX_DAYS = 365
+
+@register_planner("quick_study", QuickStudyInputs, aliases=("quick", "Quick Study"))
+def generate_quick_study_plan(subjects, topics, start_time, end_time, break_duration, 
+                            break_frequency, preferred_activities, special_events, 
+                            learning_style, priority_settings, days=2, busy=None,
+                            context=None):
+    # In a real app, this would use AI to generate a personalized plan
+    # For this example, we'll create a simulated plan
+    
+    context = context or GenerationContext()
+    plan_id = context.new_id()
+    
+    priorities = parse_priorities(priority_settings)
+    
+    # The daily study window, minus any calendar events and special events.
+    # Work that does not fit in the requested days rolls onto the following ones.
+    today = context.today()
+    days = max(1, days)
+    busy = block_special_events(special_events, busy, today)
+    window = [(start_time.hour * 60 + start_time.minute, end_time.hour * 60 + end_time.minute)]
+    timeline = Timeline(today, today + timedelta(days=days - 1), window, busy=busy,
+                        overflow_until=today + timedelta(days=MAX_DAYS - 1))
+    
+    # One demand per subtask; higher-priority topics are placed first
+    session = max(1, break_frequency // 2)  # Shorter sessions
+    demands = []
+    for subject in subjects:
+        if subject in topics:
+            for topic in topics[subject]:
+                # Determine priority
+                priority = "Medium"  # Default
+                for key in priorities:
+                    if key == subject or key == f"{subject}/{topic}":
+                        priority = priorities[key]
+                
+                # Create multiple subtasks for each topic
+                for subtask in (f"Read about {topic}", f"Take notes on {topic}",
+                                f"Practice problems on {topic}", f"Review {topic} concepts"):
+                    demands.append(Demand((subject, subtask), session, priority=priority, session=session))
+    
+    # Capacity check: every session plus the breaks between them, against
+    # the free time of the requested days
+    minutes_needed = len(demands) * session + max(0, len(demands) - 1) * break_duration
+    minutes_available = timeline.capacity()
+    
+    # Each session is followed by a break of break_duration minutes
+    sessions = timeline.schedule(demands, gap=break_duration, min_session=min(15, session))
+    day_busy = {}
+    
+    tasks = []
+    for demand, day, start, end in sessions:
+        subject, subtask = demand.key
+        date = day.strftime("%Y-%m-%d")
+        tasks.append(Task(
+            id=len(tasks),
+            subject=subject,
+            description=subtask,
+            date=date,
+            start_time=start,
+            end_time=end,
+            type='study',
+            priority=demand.priority
+        ))
+        
+        # Break, cut short by the end of the window or the next commitment
+        if date not in day_busy:
+            day_busy[date] = busy.merged(date)
+        break_end = min([end + break_duration, window[0][1]] + [s for s, e in day_busy[date] if s >= end])
+        if break_end > end:
+            # Choose a random break activity
+            activity = "Take a break"
+            if preferred_activities:
+                activity = f"{context.rng.choice(preferred_activities)}"
+            
+            tasks.append(Task(
+                id=len(tasks),
+                subject='Break',
+                description=activity,
+                date=date,
+                start_time=end,
+                end_time=break_end,
+                type='break'
+            ))
+    
+    # Generate study techniques based on learning style
+    study_techniques = generate_study_technique(learning_style)
+    
+    # Generate resource recommendations
+    resources = generate_resource_recommendations(subjects, learning_style)
+    
+    # Create the plan, recording the capacity check for the form to report
+    extra = {"minutes_needed": minutes_needed, "minutes_available": minutes_available, "days": days}
+    unscheduled = sum(demand.remaining for demand in demands)
+    if unscheduled:
+        extra["minutes_unscheduled"] = unscheduled
+    plan = Plan(
+        id=plan_id,
+        type='Quick Study',
+        created_at=context.now().strftime("%Y-%m-%d %H:%M"),
+        tasks=tasks,
+        study_techniques=study_techniques,
+        resources=resources,
+        extra=extra
+    )
+    
+    return plan
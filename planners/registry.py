@@ -0,0 +1,58 @@
+# Registry of plan generators by plan type
+
+from planners.cache import plan_cache
+
+_planners = {}
+
+def _key(name):
+    """Normalize 'Exam Time', 'exam-time' and 'exam_time' to one key"""
+    return str(name).strip().lower().replace(" ", "_").replace("-", "_")
+
+class Planner:
+    """A registered plan generator and the schema of its inputs"""
+    __slots__ = ("name", "generate", "schema")
+
+    def __init__(self, name, generate, schema):
+        self.name = name
+        self.generate = generate
+        self.schema = schema
+
+    def __call__(self, inputs, cache=None):
+        """Validate inputs (a dict or schema instance) and generate the plan, through cache if given"""
+        if not isinstance(inputs, self.schema):
+            inputs = self.schema.from_dict(inputs)
+        if cache is None:
+            return self.generate(**inputs.as_kwargs())
+        return cache.get_or_generate(self.name, inputs.as_kwargs(), self.generate)
+
+def register_planner(name, schema, aliases=()):
+    """Decorator registering a generator under a plan type name and aliases"""
+    def decorator(generate):
+        planner = Planner(name, generate, schema)
+        for key in (name,) + tuple(aliases):
+            _planners[_key(key)] = planner
+        return generate
+    return decorator
+
+def get_planner(name):
+    """Get the planner registered for a plan type, or None"""
+    return _planners.get(_key(name))
+
+def planner_names():
+    """Canonical names of all registered planners"""
+    return sorted({planner.name for planner in _planners.values()})
+
+def generate_plan(plan_type, inputs, use_cache=True):
+    """
+    Generate a plan with the planner registered for plan_type.
+
+    Repeated requests with the same inputs on the same day are served from
+    the shared plan cache, with a new plan id and creation time.
+
+    Raises:
+        ValueError: If the plan type is unknown or the inputs are invalid
+    """
+    planner = get_planner(plan_type)
+    if planner is None:
+        raise ValueError(f"Unknown plan type {plan_type!r}; expected one of {', '.join(planner_names())}")
+    return planner(inputs, plan_cache if use_cache else None)
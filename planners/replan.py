@@ -0,0 +1,163 @@
+# Incremental replanning: move a plan's overdue sessions onto the days left
+#
+# Completed tasks and unfinished sessions from today on keep their slots.
+# Every unfinished session dated before today becomes a demand of its own
+# length (plus the break that follows it, which moves with it) with the
+# plan's deadline (the exam date, or the assignment's due date), and is
+# packed earliest-deadline-first into the free time between today and that
+# deadline. Quick Study plans have no deadline; their sessions roll onto
+# the following days as they do when the plan is generated. Tasks are
+# rewritten in place, so their indices, and with them the stored progress,
+# stay valid.
+
+from datetime import datetime, timedelta
+
+from intervals import BusyIndex
+from models import Plan, Task
+from planners.context import GenerationContext
+from planners.quick_study import MAX_DAYS
+from scheduler import Demand, Timeline, merge_intervals
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+def _timed(task):
+    return task.date and task.start is not None and task.end is not None
+
+def _deadlines(plan, tasks, today):
+    """Exclusive deadline per subject: the exam date, a recorded due date, else the day after its last session"""
+    if plan.type == "Quick Study":
+        return lambda subject: None
+    if plan.exam_date:
+        exam_date = _parse_date(plan.exam_date)
+        return lambda subject: max(exam_date, today + timedelta(days=1))
+    due_dates = {subject: _parse_date(day) for subject, day in (plan.get("due_dates") or {}).items()}
+    last_days = {}
+    for task in tasks:
+        if task.date and task.type != "break" and task.date > last_days.get(task.subject, ""):
+            last_days[task.subject] = task.date
+    def deadline(subject):
+        due = due_dates.get(subject)
+        if due is None:
+            due = _parse_date(last_days[subject]) + timedelta(days=1)
+        return max(due, today + timedelta(days=1))
+    return deadline
+
+def replan(db, plan_id, today=None, busy=None):
+    """
+    Reschedule the overdue unfinished sessions of a stored plan from today on.
+
+    Study windows, the daily limit and weekend use are inferred from the
+    plan's own sessions. Calendar events, other plans' tasks and this plan's
+    sessions that stay put are kept clear. Sessions that no longer fit
+    before their deadline keep their old (past) slot and are reported.
+
+    Args:
+        db: Database holding the plan and its progress
+        plan_id (str): Plan to reschedule
+        today (date): First day to schedule on (default: today)
+        busy (BusyIndex): Commitments to schedule around (default: read from db)
+
+    Returns:
+        tuple: (updated Plan, indices of tasks that could not be rescheduled)
+
+    Raises:
+        ValueError: If the plan does not exist, or was changed by someone
+            else while it was being rescheduled (nothing is written then)
+    """
+    plan = db.get_plan(plan_id)
+    if plan is None:
+        raise ValueError(f"Unknown plan {plan_id!r}")
+    plan = Plan.from_dict(plan)
+    today = today or GenerationContext().today()
+    today_key = today.strftime("%Y-%m-%d")
+    tasks = [Task.from_dict(task) for task in plan.tasks]
+    completed = set(db.get_progress(plan_id)["completed_tasks"])
+    overdue = [
+        i for i, task in enumerate(tasks)
+        if i not in completed and _timed(task) and task.date < today_key and task.type != "break"
+    ]
+    if not overdue:
+        return plan, []
+
+    # A break belongs to the session it directly follows and moves with it
+    breaks = {}
+    for i in overdue:
+        j = i + 1
+        if (j < len(tasks) and j not in completed and tasks[j].type == "break"
+                and tasks[j].date == tasks[i].date and tasks[j].start == tasks[i].end and _timed(tasks[j])):
+            breaks[i] = j
+    moving = set(overdue) | set(breaks.values())
+
+    # The plan's shape: the time of day it used, its busiest day and its weekends
+    windows = merge_intervals((task.start, task.end) for task in tasks if _timed(task))
+    daily = {}
+    for task in tasks:
+        if _timed(task):
+            daily[task.date] = daily.get(task.date, 0) + task.end - task.start
+    skip_weekends = not any(_parse_date(day).weekday() >= 5 for day in daily)
+
+    deadline = _deadlines(plan, tasks, today)
+    demands = []
+    for i in overdue:
+        minutes = tasks[i].end - tasks[i].start
+        if i in breaks:
+            minutes += tasks[breaks[i]].end - tasks[breaks[i]].start
+        demands.append(Demand(i, minutes, deadline=deadline(tasks[i].subject),
+                              priority=tasks[i].priority or "Medium", session=minutes))
+    deadlines = [demand.deadline for demand in demands if demand.deadline is not None]
+    if deadlines:
+        last_day = max(deadlines) - timedelta(days=1)
+        overflow_until = None
+    else:
+        last_day = today
+        overflow_until = today + timedelta(days=MAX_DAYS - 1)
+
+    # Everything of this plan that stays on or after today is busy, and counts
+    # against the daily limit
+    if busy is None:
+        busy = BusyIndex.from_database(db, today, overflow_until or last_day, exclude_plan=plan_id)
+    used = {}
+    for i, task in enumerate(tasks):
+        if i not in moving and _timed(task) and task.date >= today_key:
+            busy.add(task.date, task.start, task.end, task)
+            day = _parse_date(task.date)
+            used[day] = used.get(day, 0) + task.end - task.start
+
+    timeline = Timeline(today, last_day, windows, daily_limit=max(daily.values()),
+                        skip_weekends=skip_weekends, busy=busy, overflow_until=overflow_until, used=used)
+    if not timeline.days:
+        timeline = Timeline(today, last_day, windows, daily_limit=max(daily.values()), busy=busy,
+                            overflow_until=overflow_until, used=used)
+    # Never split a session: that would add tasks and shift every later index
+    sessions = timeline.schedule(demands, min_session=max(demand.minutes for demand in demands))
+
+    for demand, day, start, end in sessions:
+        date = day.strftime("%Y-%m-%d")
+        task = tasks[demand.key]
+        study_end = start + task.end - task.start
+        tasks[demand.key] = Task(
+            task.id, task.subject, task.description, start, study_end, task.type,
+            task.priority, date, task.extra
+        )
+        if demand.key in breaks:
+            rest = tasks[breaks[demand.key]]
+            tasks[breaks[demand.key]] = Task(
+                rest.id, rest.subject, rest.description, study_end, end, rest.type,
+                rest.priority, date, rest.extra
+            )
+    unscheduled = []
+    for demand in demands:
+        if demand.remaining > 0:
+            unscheduled.append(demand.key)
+            if demand.key in breaks:
+                unscheduled.append(breaks[demand.key])
+
+    updated = Plan(
+        plan.id, plan.type, plan.created_at, tasks, list(plan.study_techniques), list(plan.resources),
+        plan.exam_date, plan.version, dict(plan.extra) if plan.extra else None
+    )
+    # Only write over the version read above, so a concurrent edit is not lost
+    if not db.update_plan(plan_id, updated, expected_version=plan.version or 0):
+        raise ValueError(f"Plan {plan_id!r} was changed while it was being rescheduled; try again")
+    return db.get_plan(plan_id), sorted(unscheduled)
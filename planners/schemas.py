@@ -0,0 +1,158 @@
+# Typed input schemas for the planners
+#
+# Each schema lists its fields with a converter and a default, so inputs
+# arriving as plain dicts (JSONL/CSV batch specs, API callers) are coerced to
+# the types the generators expect and every problem is reported at once.
+
+from datetime import date, datetime, time
+
+# Marks a field without a default
+REQUIRED = object()
+
+def text(value):
+    return "" if value is None else str(value)
+
+def integer(value):
+    return int(value)
+
+def to_date(value):
+    """Accept a date or a YYYY-MM-DD string"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+def to_time(value):
+    """Accept a time or an HH:MM string"""
+    if isinstance(value, time):
+        return value
+    return datetime.strptime(value, "%H:%M").time()
+
+def string_list(value):
+    """Accept a list or a semicolon-separated string"""
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(";") if item.strip()]
+    return [str(item) for item in value or []]
+
+def mapping(convert):
+    """Converter for a dict whose values are converted with `convert`"""
+    def convert_mapping(value):
+        return {str(key): convert(item) for key, item in (value or {}).items()}
+    return convert_mapping
+
+def priority_text(value):
+    """Accept the forms' 'Item: Priority' lines or a mapping"""
+    if isinstance(value, dict):
+        return "\n".join(f"{item}: {priority}" for item, priority in value.items())
+    return text(value)
+
+def passthrough(value):
+    return value
+
+class Field:
+    """
+    One typed input: its name, converter, default and accepted alternative keys.
+
+    A callable default (list, dict) is a factory called for each instance.
+    """
+    __slots__ = ("name", "convert", "default", "aliases")
+
+    def __init__(self, name, convert, default=REQUIRED, aliases=()):
+        self.name = name
+        self.convert = convert
+        self.default = default
+        self.aliases = aliases
+
+    def make_default(self):
+        if self.default is REQUIRED:
+            raise TypeError(f"{self.name} is required")
+        return self.default() if callable(self.default) else self.default
+
+class Schema:
+    """Validated planner inputs; subclasses list their FIELDS"""
+    FIELDS = ()
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field.name, values[field.name] if field.name in values else field.make_default())
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build validated inputs from a plain dict.
+
+        Unknown keys are ignored, so a batch spec can carry extra columns.
+
+        Raises:
+            ValueError: Listing every missing or malformed field
+        """
+        values = {}
+        problems = []
+        for field in cls.FIELDS:
+            key = next((key for key in (field.name,) + field.aliases if data.get(key) is not None), None)
+            if key is None:
+                if field.default is REQUIRED:
+                    problems.append(f"{field.name} is required")
+                else:
+                    values[field.name] = field.make_default()
+                continue
+            try:
+                values[field.name] = field.convert(data[key])
+            except (TypeError, ValueError, AttributeError) as e:
+                problems.append(f"{field.name}: {e}")
+        if problems:
+            raise ValueError(f"Invalid {cls.__name__}: " + "; ".join(problems))
+        return cls(**values)
+
+    def as_kwargs(self):
+        """Keyword arguments for the generator"""
+        return {field.name: getattr(self, field.name) for field in self.FIELDS}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_kwargs()!r})"
+
+class QuickStudyInputs(Schema):
+    FIELDS = (
+        Field("subjects", string_list),
+        Field("topics", mapping(string_list)),
+        Field("start_time", to_time, time(8, 0)),
+        Field("end_time", to_time, time(20, 0)),
+        Field("break_duration", integer, 15),
+        Field("break_frequency", integer, 50),
+        Field("preferred_activities", string_list, list),
+        Field("special_events", text, ""),
+        Field("learning_style", text, "Mixed"),
+        Field("priority_settings", priority_text, "", aliases=("priorities",)),
+        Field("days", integer, 2),
+        Field("busy", passthrough, None),
+        Field("context", passthrough, None)
+    )
+
+class ExamTimeInputs(Schema):
+    FIELDS = (
+        Field("subjects", string_list),
+        Field("exam_date", to_date),
+        Field("daily_hours", integer, 4),
+        Field("difficulty_dict", mapping(integer), dict, aliases=("difficulty",)),
+        Field("preferred_time", string_list, list),
+        Field("special_events", text, ""),
+        Field("learning_style", text, "Mixed"),
+        Field("priority_settings", priority_text, "", aliases=("priorities",)),
+        Field("busy", passthrough, None),
+        Field("context", passthrough, None)
+    )
+
+class SubmissionsInputs(Schema):
+    FIELDS = (
+        Field("assignments", string_list),
+        Field("due_date_dict", mapping(to_date), dict, aliases=("due_dates",)),
+        Field("daily_hours", integer, 3),
+        Field("complexity_dict", mapping(integer), dict, aliases=("complexity",)),
+        Field("preferred_time", string_list, list),
+        Field("special_events", text, ""),
+        Field("work_style", text, "Spread Out"),
+        Field("priority_settings", priority_text, "", aliases=("priorities",)),
+        Field("busy", passthrough, None),
+        Field("context", passthrough, None)
+    )
@@ -0,0 +1,113 @@
+# Submissions planner: assignment work scheduled before each due date
+
+from datetime import timedelta
+
+from ai import generate_resource_recommendations, generate_study_technique
+from models import Plan, Task
+from planners.common import block_special_events, parse_priorities
+from planners.context import GenerationContext
+from planners.registry import register_planner
+from planners.schemas import SubmissionsInputs
+from scheduler import Demand, Timeline, preferred_windows
+
+def _submission_descriptions(assignment, count):
+    """Describe the work sessions of an assignment from start to submission"""
+    if count == 1:
+        return [f"Complete {assignment}"]
+    stages = [
+        f"Start {assignment} - Research and planning",
+        f"Continue {assignment} - Draft initial content",
+        f"Continue {assignment} - Develop main sections",
+        f"Finalize {assignment} - Review and polish",
+        f"Submit {assignment}"
+    ]
+    if count <= len(stages):
+        return stages[:count - 1] + stages[-1:]
+    return stages[:3] + [f"Continue working on {assignment}"] * (count - len(stages)) + stages[3:]
+
+@register_planner("submissions", SubmissionsInputs, aliases=("submission",))
+def generate_submissions_plan(assignments, due_date_dict, daily_hours, 
+                            complexity_dict, preferred_time, special_events, 
+                            work_style, priority_settings, busy=None,
+                            context=None):
+    # In a real app, this would use AI to generate a personalized plan
+    # For this example, we'll create a simulated plan
+    
+    context = context or GenerationContext()
+    plan_id = context.new_id()
+    
+    priorities = parse_priorities(priority_settings)
+    
+    today = context.today()
+    
+    # Work on each assignment on days before it is due (at least today)
+    deadlines = {
+        a: max(due_date_dict.get(a, today + timedelta(days=7)), today + timedelta(days=1))
+        for a in assignments
+    }
+    last_day = max(deadlines.values(), default=today + timedelta(days=1)) - timedelta(days=1)
+    busy = block_special_events(special_events, busy, today)
+    timeline = Timeline(today, last_day, preferred_windows(preferred_time), daily_limit=daily_hours * 60, busy=busy)
+    
+    # Session length and spreading follow the work style
+    if work_style == "Focused Sessions":
+        session, max_per_day, sessions_needed = 120, None, lambda c: max(1, c // 2)
+    elif work_style == "Spread Out":
+        session, max_per_day, sessions_needed = 60, 1, lambda c: c
+    else:  # Deadline Driven
+        session, max_per_day, sessions_needed = 90, None, lambda c: max(1, c // 3)
+    session = min(session, daily_hours * 60)
+    
+    demands = [
+        Demand(assignment, sessions_needed(complexity_dict.get(assignment, 3)) * session,
+               deadline=deadlines[assignment], priority=priorities.get(assignment, "Medium"),
+               session=session, max_per_day=max_per_day)
+        for assignment in assignments
+    ]
+    sessions = timeline.schedule(demands)
+    
+    session_counts = {}
+    for demand, day, start, end in sessions:
+        session_counts[demand.key] = session_counts.get(demand.key, 0) + 1
+    descriptions = {key: iter(_submission_descriptions(key, count)) for key, count in session_counts.items()}
+    
+    tasks = []
+    for demand, day, start, end in sessions:
+        tasks.append(Task(
+            id=len(tasks),
+            subject=demand.key,
+            description=next(descriptions[demand.key]),
+            date=day.strftime("%Y-%m-%d"),
+            start_time=start,
+            end_time=end,
+            type='study',
+            priority=demand.priority
+        ))
+    
+    
+    # Generate study techniques based on work style
+    if work_style == "Focused Sessions":
+        technique_style = "Visual"
+    elif work_style == "Spread Out":
+        technique_style = "Mixed"
+    else:  # Deadline Driven
+        technique_style = "Reading"
+    
+    study_techniques = generate_study_technique(technique_style)
+    
+    # Generate resource recommendations
+    resources = generate_resource_recommendations(assignments, technique_style)
+    
+    # Create the plan
+    plan = Plan(
+        id=plan_id,
+        type='Submissions',
+        created_at=context.now().strftime("%Y-%m-%d %H:%M"),
+        tasks=tasks,
+        study_techniques=study_techniques,
+        resources=resources,
+        # Kept so the plan can be replanned against the real due dates
+        extra={"due_dates": {a: deadlines[a].strftime("%Y-%m-%d") for a in assignments}}
+    )
+    
+    return plan
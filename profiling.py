@@ -0,0 +1,139 @@
+# Startup and per-page timing for the Streamlit app
+#
+# Streamlit re-executes app.py on every interaction, so cold-start cost (the
+# first run of a process, which pays for every import) and per-rerun cost
+# (each page render) are tracked separately. Imports are timed by a meta
+# path finder that wraps the loader of every module loaded after install(),
+# so the report covers lazy page-level imports as well as the eager ones.
+# Set STUDY_PLANNER_PROFILE=1 to time imports and show the report in the
+# app's sidebar.
+
+import importlib.abc
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+class _TimedLoader(importlib.abc.Loader):
+    """Delegating loader that times exec_module"""
+
+    def __init__(self, loader, profile):
+        self._loader = loader
+        self._profile = profile
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profile._enter_import(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profile._exit_import(module.__name__)
+
+    def __getattr__(self, name):
+        # get_data, is_package, get_resource_reader, ...
+        return getattr(self._loader, name)
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Finds specs through the other finders and swaps in a timing loader"""
+
+    def __init__(self, profile):
+        self._profile = profile
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self._profile)
+                return spec
+        return None
+
+class StartupProfile:
+    """Import times per module and render times per page for one process"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # module -> [cumulative seconds, self seconds]
+        self.imports = {}
+        # page -> [renders, total seconds, last seconds, slowest seconds]
+        self.pages = {}
+        self.cold_start = None
+        # Imports in progress, per thread: [module, start, seconds spent in nested imports]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def install(self):
+        """Start timing imports; calling it again is a no-op"""
+        if self._timer is None:
+            self._timer = _ImportTimer(self)
+            sys.meta_path.insert(0, self._timer)
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _enter_import(self, name):
+        self._stack().append([name, time.perf_counter(), 0.0])
+
+    def _exit_import(self, name):
+        stack = self._stack()
+        name, started, children = stack.pop()
+        elapsed = time.perf_counter() - started
+        if stack:
+            stack[-1][2] += elapsed
+        with self._lock:
+            self.imports[name] = [elapsed, elapsed - children]
+
+    @contextmanager
+    def page(self, name):
+        """Time one render of a page; the first render of the process also marks cold start"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            elapsed = finished - started
+            with self._lock:
+                stats = self.pages.setdefault(name, [0, 0.0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = elapsed
+                stats[3] = max(stats[3], elapsed)
+                if self.cold_start is None:
+                    self.cold_start = finished - self.started
+
+    def slowest_imports(self, limit=15):
+        """(module, cumulative ms, self ms) for the imports with the most self time"""
+        with self._lock:
+            items = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)
+        return [(name, total * 1000, own * 1000) for name, (total, own) in items[:limit]]
+
+    def page_times(self):
+        """(page, renders, mean ms, last ms, slowest ms) for every page rendered so far"""
+        with self._lock:
+            return [
+                (name, renders, total / renders * 1000, last * 1000, slowest * 1000)
+                for name, (renders, total, last, slowest) in sorted(self.pages.items())
+            ]
+
+    def report(self):
+        """Plain-text report of cold start, import and page times"""
+        lines = []
+        if self.cold_start is not None:
+            lines.append(f"Cold start: {self.cold_start * 1000:.0f} ms")
+        lines.append("Imports (cumulative / self ms):")
+        for name, total, own in self.slowest_imports():
+            lines.append(f"  {name}: {total:.1f} / {own:.1f}")
+        lines.append("Pages (renders, mean / last / slowest ms):")
+        for name, renders, mean, last, slowest in self.page_times():
+            lines.append(f"  {name}: {renders}, {mean:.1f} / {last:.1f} / {slowest:.1f}")
+        return "\n".join(lines)
+
+# One profile per process; it survives Streamlit reruns because modules are cached
+profile = StartupProfile()
@@ -0,0 +1,183 @@
+# Constraint-based session scheduling shared by the plan generators
+#
+# A Timeline holds the free time of each day in a date range: the preferred
+# daily windows minus anything already busy (calendar events, other plans'
+# tasks), capped by a daily study limit. Demands (minutes of work for a
+# subject or assignment, with a deadline and priority) are packed into it
+# earliest-deadline-first, so nothing overlaps and every session lands
+# before its deadline.
+
+import heapq
+from datetime import date, timedelta
+
+# Daily windows (minutes since midnight) for each preferred study time
+TIME_WINDOWS = {
+    "Morning": (8 * 60, 12 * 60),
+    "Afternoon": (13 * 60, 17 * 60),
+    "Evening": (17 * 60, 20 * 60),
+    "Night": (20 * 60, 23 * 60)
+}
+
+# Used when no preferred time is selected
+DEFAULT_TIMES = ("Morning", "Afternoon", "Evening")
+
+PRIORITY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+
+def merge_intervals(intervals):
+    """Sort (start, end) intervals and coalesce the ones that overlap or touch"""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def preferred_windows(preferred_time):
+    """Daily windows for the selected preferred study times"""
+    times = [time for time in preferred_time or () if time in TIME_WINDOWS] or DEFAULT_TIMES
+    return merge_intervals(TIME_WINDOWS[time] for time in times)
+
+class Demand:
+    """Minutes of work to schedule for one subject, topic or assignment"""
+    __slots__ = ("key", "minutes", "remaining", "deadline", "priority", "session", "max_per_day")
+
+    def __init__(self, key, minutes, deadline=None, priority="Medium", session=60, max_per_day=None):
+        self.key = key
+        self.minutes = minutes
+        self.remaining = minutes
+        # Exclusive: sessions are placed on days strictly before the deadline
+        self.deadline = deadline
+        self.priority = priority
+        self.session = session
+        self.max_per_day = max_per_day
+
+    def _order(self, position):
+        """Heap key: earliest deadline, then least progress, then priority"""
+        done = 1 - self.remaining / self.minutes if self.minutes else 1
+        return (self.deadline or date.max, done, PRIORITY_RANK.get(self.priority, 1), position)
+
+class Timeline:
+    """Free study time per day between two dates, consumed as sessions are placed"""
+
+    def __init__(self, start, end, windows, daily_limit=None, skip_weekends=False, busy=None,
+                 overflow_until=None, used=None):
+        """
+        busy is an optional intervals.BusyIndex of commitments to schedule around.
+
+        With overflow_until, schedule() keeps adding days after `end`, up to
+        that date, for as long as demands are left. used maps dates to minutes
+        already committed against the daily limit.
+        """
+        self.daily_limit = daily_limit
+        self.windows = windows
+        self.skip_weekends = skip_weekends
+        self.busy = busy
+        self.end = end
+        self.overflow_until = overflow_until
+        self.used = used or {}
+        # [date, free [start, end] intervals, minutes used]
+        self.days = []
+        day = start
+        while day <= end:
+            self._add_day(day)
+            day += timedelta(days=1)
+
+    def _add_day(self, day):
+        if self.skip_weekends and day.weekday() >= 5:
+            return
+        if self.busy is not None:
+            free = [list(slot) for slot in self.busy.free_slots(day, 1, self.windows)]
+        else:
+            free = [list(window) for window in self.windows]
+        self.days.append([day, free, self.used.get(day, 0)])
+
+    def _schedule_days(self, pending):
+        """Yield the days in order, adding overflow days while pending() is true"""
+        i = 0
+        day = self.end + timedelta(days=1)
+        while True:
+            while i < len(self.days):
+                yield self.days[i]
+                i += 1
+            if self.overflow_until is None:
+                return
+            while i == len(self.days) and day <= self.overflow_until and pending():
+                self._add_day(day)
+                day += timedelta(days=1)
+            if i == len(self.days):
+                return
+
+    def capacity(self, until=None):
+        """Total schedulable minutes left, on days before `until` if given"""
+        total = 0
+        for day, free, used in self.days:
+            if until is not None and day >= until:
+                break
+            minutes = sum(end - start for start, end in free)
+            if self.daily_limit is not None:
+                minutes = min(minutes, self.daily_limit - used)
+            total += max(0, minutes)
+        return total
+
+    def schedule(self, demands, gap=0, min_session=30):
+        """
+        Pack demands into the free time, earliest deadline first.
+
+        Ties between demands sharing a deadline go to the one that has
+        received the smallest share of its minutes, so subjects studied
+        towards the same exam are interleaved across the days. Each
+        placement is O(log n) in the number of demands.
+
+        Args:
+            demands (list): Demand objects; their `remaining` minutes are updated
+            gap (int): Minutes left free after each session (e.g. for a break)
+            min_session (int): Shortest session worth placing, unless it finishes a demand
+
+        Returns:
+            list: (demand, date, start, end) sessions in chronological order
+        """
+        heap = [(demand._order(i), i, demand) for i, demand in enumerate(demands) if demand.remaining > 0]
+        heapq.heapify(heap)
+        sessions = []
+        for day_entry in self._schedule_days(lambda: heap):
+            if not heap:
+                break
+            day, free, used = day_entry
+            placed_today = {}
+            deferred = []
+            while heap and free:
+                budget = self.daily_limit - used if self.daily_limit is not None else None
+                if budget is not None and budget <= 0:
+                    break
+                order, i, demand = heapq.heappop(heap)
+                if demand.deadline is not None and day >= demand.deadline:
+                    continue
+                if demand.max_per_day is not None and placed_today.get(i, 0) >= demand.max_per_day:
+                    deferred.append((order, i, demand))
+                    continue
+                start, end = free[0]
+                length = min(demand.session, demand.remaining, end - start)
+                if budget is not None:
+                    length = min(length, budget)
+                if length < min(min_session, demand.remaining):
+                    heapq.heappush(heap, (order, i, demand))
+                    if budget is not None and budget < min(min_session, demand.remaining):
+                        break
+                    free.pop(0)
+                    continue
+                sessions.append((demand, day, start, start + length))
+                demand.remaining -= length
+                used += length
+                placed_today[i] = placed_today.get(i, 0) + 1
+                free[0][0] = min(start + length + gap, end)
+                if free[0][0] >= end:
+                    free.pop(0)
+                if demand.remaining > 0:
+                    heapq.heappush(heap, (demand._order(i), i, demand))
+            day_entry[2] = used
+            for item in deferred:
+                heapq.heappush(heap, item)
+        return sessions
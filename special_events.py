@@ -0,0 +1,176 @@
+# Parser for the "special events" text area of the plan forms
+#
+# Each line reads "Event, Date[, Duration]", for example:
+#   Math exam, 2026-10-20 09:00, 3h
+#   Dentist, 2026-10-21 14:00-15:30
+#   Trip, 2026-10-24 to 2026-10-26
+#   Football, today 18:00, 1h30m
+#   Family visit, 2026-11-02, 2 days
+#   Study group, 2026-10-22 19:00, 2       (a bare number is hours)
+#   Party, 2026-10-31 20:00-24:00          (24:00 is the end of the day)
+# Lines become per-day blocked intervals that the scheduler keeps free.
+
+import re
+from datetime import date, datetime, timedelta
+
+from models import minutes_to_time, time_to_minutes
+
+# Longest span a single line may block
+MAX_DAYS = 366
+
+DAY_MINUTES = 24 * 60
+
+_DATE = r"\d{4}-\d{1,2}-\d{1,2}|today|tomorrow"
+_TIME = r"\d{1,2}:\d{2}"
+
+WHEN_RE = re.compile(
+    rf"^(?:(?P<date>{_DATE})(?:\s*(?:to|-|–)\s*(?P<until>{_DATE}))?)?"
+    rf"\s*(?:(?P<start>{_TIME})(?:\s*(?:to|-|–)\s*(?P<end>{_TIME}))?)?$",
+    re.IGNORECASE
+)
+TIME_RANGE_RE = re.compile(rf"^(?P<start>{_TIME})\s*(?:to|-|–)\s*(?P<end>{_TIME})$", re.IGNORECASE)
+DURATION_RE = re.compile(
+    r"^(?:(?P<days>\d+)\s*d(?:ays?)?"
+    r"|(?P<all_day>all[\s-]?day)"
+    r"|(?P<bare_hours>\d+(?:\.\d+)?)"
+    r"|(?=\d)(?:(?P<hours>\d+(?:\.\d+)?)\s*h(?:ours?|rs?)?)?\s*(?:(?P<minutes>\d+)\s*m(?:in(?:ute)?s?)?)?)$",
+    re.IGNORECASE
+)
+
+class BlockedInterval:
+    """Part of one day taken by a special event; times are minutes since midnight"""
+    __slots__ = ("name", "date", "start", "end")
+
+    def __init__(self, name, date, start, end):
+        self.name = name
+        self.date = date
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"BlockedInterval({self.name!r}, {self.date}, {minutes_to_time(self.start)}-{minutes_to_time(self.end)})"
+
+def _parse_date(value, today):
+    """Parse YYYY-MM-DD, 'today' or 'tomorrow'"""
+    value = value.lower()
+    if value == "today":
+        return today
+    if value == "tomorrow":
+        return today + timedelta(days=1)
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"invalid date '{value}'")
+
+def _parse_time(value, end=False):
+    """Parse HH:MM into minutes, rejecting impossible times; an end time may be 24:00"""
+    minutes = time_to_minutes(value)
+    if minutes > DAY_MINUTES or (minutes == DAY_MINUTES and not end) or int(value.split(":")[1]) >= 60:
+        raise ValueError(f"invalid time '{value}'")
+    return minutes
+
+def _span(name, first, start, end):
+    """Split [start, end) minutes counted from the start of `first` into per-day intervals"""
+    intervals = []
+    day = first
+    while start < end:
+        day_end = min(end, DAY_MINUTES)
+        intervals.append(BlockedInterval(name, day, start, day_end))
+        day += timedelta(days=1)
+        start, end = 0, end - DAY_MINUTES
+    return intervals
+
+def _parse_line(line, today):
+    """Parse one line into blocked intervals; raises ValueError with a readable message"""
+    fields = [field.strip() for field in line.split(",")]
+    if len(fields) < 2 or not fields[0]:
+        raise ValueError("expected 'Event, Date[, Duration]'")
+    if len(fields) > 3:
+        raise ValueError("too many commas")
+    name, when = fields[0], fields[1]
+    duration = fields[2] if len(fields) == 3 else ""
+
+    match = WHEN_RE.match(when)
+    if not match or not when:
+        raise ValueError(f"unrecognised date '{when}'")
+    first = _parse_date(match["date"], today) if match["date"] else today
+    last = _parse_date(match["until"], today) if match["until"] else first
+    start = _parse_time(match["start"]) if match["start"] else None
+    end = _parse_time(match["end"], end=True) if match["end"] else None
+    if not match["date"] and start is None:
+        raise ValueError(f"unrecognised date '{when}'")
+
+    days = None
+    length = None
+    if duration:
+        time_range = TIME_RANGE_RE.match(duration)
+        duration_match = DURATION_RE.match(duration)
+        if time_range and end is None:
+            start = _parse_time(time_range["start"]) if start is None else start
+            end = _parse_time(time_range["end"], end=True)
+        elif duration_match and duration_match["days"]:
+            days = int(duration_match["days"])
+        elif duration_match and duration_match["all_day"]:
+            start, end = None, None
+        elif duration_match:
+            hours = duration_match["hours"] or duration_match["bare_hours"] or 0
+            length = round(float(hours) * 60) + int(duration_match["minutes"] or 0)
+            if length <= 0:
+                raise ValueError(f"unrecognised duration '{duration}'")
+        else:
+            raise ValueError(f"unrecognised duration '{duration}'")
+
+    if days is not None:
+        if last != first:
+            raise ValueError("give either a date range or a number of days, not both")
+        last = first + timedelta(days=max(1, days) - 1)
+    if last < first:
+        raise ValueError("the range ends before it starts")
+    if (last - first).days >= MAX_DAYS:
+        raise ValueError(f"spans more than {MAX_DAYS} days")
+
+    if start is not None and end is not None:
+        if end <= start:
+            raise ValueError("end time must be after start time")
+        daily = (start, end)
+    elif start is not None and length is not None:
+        daily = (start, start + length)
+    elif start is not None and days is not None:
+        # Blocked from the start time on the first day through the last day
+        return _span(name, first, start, (last - first).days * DAY_MINUTES + DAY_MINUTES)
+    elif start is not None:
+        raise ValueError("add an end time or a duration")
+    else:
+        # No time of day given: block the whole day
+        daily = (0, DAY_MINUTES)
+
+    intervals = []
+    day = first
+    while day <= last:
+        intervals.extend(_span(name, day, *daily))
+        day += timedelta(days=1)
+    return intervals
+
+def parse_special_events(text, today=None):
+    """
+    Parse the special events text area.
+
+    Args:
+        text (str): One "Event, Date[, Duration]" entry per line
+        today (date): Date that 'today', 'tomorrow' and time-only entries refer to
+
+    Returns:
+        tuple: (list of BlockedInterval sorted by date and start, list of error messages)
+    """
+    today = today or date.today()
+    blocked = []
+    errors = []
+    for number, line in enumerate((text or "").splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            blocked.extend(_parse_line(line, today))
+        except ValueError as e:
+            errors.append(f"Line {number} ('{line.strip()}'): {e}")
+    blocked.sort(key=lambda interval: (interval.date, interval.start))
+    return blocked, errors
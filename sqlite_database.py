@@ -0,0 +1,698 @@
+import functools
+import heapq
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import date, datetime
+
+from changes import ChangeFeed
+from database import PROGRESS_HISTORY, _merge_completed, _unpack_bitmap
+from models import Plan, Task, as_dict
+
+# SQLite storage backend exposing the same API as database.Database.
+# Plans, tasks, progress and calendar events live in normalized tables, so a
+# single checkbox click only touches the rows it changes instead of rewriting
+# the whole JSON file.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id TEXT PRIMARY KEY,
+    type TEXT,
+    created_at TEXT,
+    exam_date TEXT,
+    version INTEGER,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    plan_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    task_id INTEGER,
+    subject TEXT,
+    description TEXT,
+    date TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    type TEXT,
+    priority TEXT,
+    extra TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (plan_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_date ON tasks (date);
+CREATE TABLE IF NOT EXISTS progress (
+    plan_id TEXT PRIMARY KEY,
+    total_tasks INTEGER NOT NULL DEFAULT 0,
+    completion_percentage REAL NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS calendar_events (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    date TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    description TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_date ON calendar_events (date, start_time);
+CREATE TABLE IF NOT EXISTS user_preferences (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS task_stats (
+    subject TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    first_rowid INTEGER
+);
+CREATE TRIGGER IF NOT EXISTS task_stats_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO task_stats (subject, total, completed, first_rowid)
+    VALUES (COALESCE(NEW.subject, ''), 1, NEW.completed, NEW.rowid)
+    ON CONFLICT (subject) DO UPDATE SET total = total + 1, completed = completed + excluded.completed;
+END;
+CREATE TRIGGER IF NOT EXISTS task_stats_delete AFTER DELETE ON tasks BEGIN
+    UPDATE task_stats SET total = total - 1, completed = completed - OLD.completed
+    WHERE subject = COALESCE(OLD.subject, '');
+    DELETE FROM task_stats WHERE subject = COALESCE(OLD.subject, '') AND total = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS task_stats_update AFTER UPDATE OF subject, completed ON tasks BEGIN
+    UPDATE task_stats SET total = total - 1, completed = completed - OLD.completed
+    WHERE subject = COALESCE(OLD.subject, '');
+    INSERT INTO task_stats (subject, total, completed, first_rowid)
+    VALUES (COALESCE(NEW.subject, ''), 1, NEW.completed, NEW.rowid)
+    ON CONFLICT (subject) DO UPDATE SET total = total + 1, completed = completed + excluded.completed;
+    DELETE FROM task_stats WHERE subject = COALESCE(OLD.subject, '') AND total = 0;
+END;
+"""
+
+# Columns stored natively; any other key is kept in the JSON `extra` column
+PLAN_COLUMNS = ("id", "type", "created_at", "exam_date", "version")
+TASK_COLUMNS = ("subject", "description", "date", "start_time", "end_time", "type", "priority")
+EVENT_COLUMNS = ("id", "title", "date", "start_time", "end_time", "description")
+
+# task_stats holds running task and completion counts per subject (Break and
+# unset subjects included, the latter under ''). The triggers keep it in step
+# with the tasks table inside every writing transaction, so the Insights
+# page reads a handful of rows instead of scanning every task.
+
+# Joined onto plan queries so plan headers carry their task count
+TASK_COUNT = (
+    "LEFT JOIN (SELECT plan_id, COUNT(*) AS task_count FROM tasks GROUP BY plan_id) AS counts "
+    "ON counts.plan_id = plans.id"
+)
+
+
+def _split_extra(record, columns):
+    """Split a record into its column values and a JSON blob of the remaining keys"""
+    values = [record.get(column) for column in columns]
+    extra = {key: value for key, value in record.items() if key not in columns}
+    return values, json.dumps(extra) if extra else None
+
+
+def _merge_extra(record, extra):
+    """Drop unset columns from a row dict and fold the `extra` JSON back in"""
+    record = {key: value for key, value in record.items() if value is not None}
+    if extra:
+        record.update(json.loads(extra))
+    return record
+
+
+def _date_key(value):
+    """Normalize a date or YYYY-MM-DD string to the stored string form"""
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+def _synchronized(method):
+    """Serialize access to the shared connection and notice commits made by other connections"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            self._check_external_changes()
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class SQLiteDatabase:
+    def __init__(self, db_path="study_planner.db"):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._upgrade_schema()
+        self.changes = ChangeFeed()
+        self._lock = threading.RLock()
+        self._progress_history = {}
+        self._data_version = self._read_data_version()
+
+    def _upgrade_schema(self):
+        """Add the version columns and task stats to databases created before they existed"""
+        def columns(table):
+            return {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        with self.conn:
+            if "version" not in columns("plans"):
+                self.conn.execute("ALTER TABLE plans ADD COLUMN version INTEGER")
+                # Plan versions used to be kept in the extra JSON
+                self.conn.execute(
+                    "UPDATE plans SET version = json_extract(extra, '$.version'), "
+                    "extra = json_remove(extra, '$.version') WHERE json_extract(extra, '$.version') IS NOT NULL"
+                )
+            if "version" not in columns("progress"):
+                self.conn.execute("ALTER TABLE progress ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            # Tasks stored before the stats triggers existed
+            if (self.conn.execute("SELECT NOT EXISTS (SELECT 1 FROM task_stats)").fetchone()[0]
+                    and self.conn.execute("SELECT EXISTS (SELECT 1 FROM tasks)").fetchone()[0]):
+                self.conn.execute(
+                    "INSERT INTO task_stats (subject, total, completed, first_rowid) "
+                    "SELECT COALESCE(subject, ''), COUNT(*), SUM(completed), MIN(rowid) FROM tasks "
+                    "GROUP BY COALESCE(subject, '')"
+                )
+
+    def _read_data_version(self):
+        """SQLite's counter of commits made through other connections"""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check_external_changes(self):
+        """Publish a full change when another process has committed since we last looked"""
+        data_version = self._read_data_version()
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self.changes.publish("all")
+
+    @_synchronized
+    def refresh(self):
+        """Pick up commits made by other connections, publishing them on the change feed"""
+
+    def close(self):
+        """Close the underlying connection"""
+        self.conn.close()
+
+    def _row_to_plan(self, row):
+        """Build a header-only Plan from its plans row; task rows are fetched on first access"""
+        header = _merge_extra({column: row[column] for column in PLAN_COLUMNS}, None)
+        extra = json.loads(row["extra"])
+        study_techniques = extra.pop("study_techniques", [])
+        resources = extra.pop("resources", [])
+        header.update(extra)
+        header["task_count"] = row["task_count"] or 0
+
+        def load():
+            return self._load_tasks(row["id"]), study_techniques, resources
+        return Plan.from_header(header, load)
+
+    @_synchronized
+    def _load_tasks(self, plan_id):
+        """Fetch the task rows of one plan"""
+        return [
+            Task.from_dict(self._row_to_task(task_row))
+            for task_row in self.conn.execute("SELECT * FROM tasks WHERE plan_id = ? ORDER BY idx", (plan_id,))
+        ]
+
+    def _row_to_task(self, row):
+        """Build a task dict from a tasks row"""
+        task = {"id": row["task_id"]}
+        task.update({column: row[column] for column in TASK_COLUMNS})
+        return _merge_extra(task, row["extra"])
+
+    def _plan_values(self, plan):
+        """Column values for a plans row; tasks are stored in their own table"""
+        values, extra = _split_extra({key: value for key, value in plan.items() if key != "tasks"}, PLAN_COLUMNS)
+        return values + [extra or "{}"]
+
+    def _insert_plan(self, plan):
+        """Insert a plan and its tasks (caller manages the transaction)"""
+        plan = as_dict(plan)
+        self.conn.execute(
+            "INSERT INTO plans (id, type, created_at, exam_date, version, extra) VALUES (?, ?, ?, ?, ?, ?)",
+            self._plan_values(plan)
+        )
+        self._insert_tasks(plan["id"], plan.get("tasks", []))
+
+    def _insert_tasks(self, plan_id, tasks, completed=()):
+        """Insert the task rows of a plan"""
+        completed = set(completed)
+        rows = []
+        for idx, task in enumerate(tasks):
+            values, extra = _split_extra(task, ("id",) + TASK_COLUMNS)
+            rows.append([plan_id, idx] + values + [extra, int(idx in completed)])
+        self.conn.executemany(
+            "INSERT INTO tasks (plan_id, idx, task_id, subject, description, date, start_time, "
+            "end_time, type, priority, extra, completed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def _insert_event(self, event):
+        """Insert a calendar event row"""
+        values, extra = _split_extra(event, EVENT_COLUMNS)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO calendar_events (id, title, date, start_time, end_time, description, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            values + [extra]
+        )
+
+    def _write_progress(self, plan_id, progress, expected_version=None):
+        """
+        Write progress totals and completion flags (caller manages the transaction).
+
+        With expected_version, nothing is written unless the stored progress
+        is still at that version. Returns whether the progress was written.
+        """
+        completed = progress.get("completed_tasks", [])
+        if "completed_bitmap" in progress:
+            # Progress exported by the JSON store packs completed tasks into a bitmap
+            completed = sorted(_unpack_bitmap(progress["completed_bitmap"]))
+        values = (progress.get("total_tasks", 0), progress.get("completion_percentage", 0), progress.get("version", 0))
+        if expected_version is None:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO progress (total_tasks, completion_percentage, version, plan_id) "
+                "VALUES (?, ?, ?, ?)",
+                values + (plan_id,)
+            )
+        elif self.conn.execute(
+            "UPDATE progress SET total_tasks = ?, completion_percentage = ?, version = ? "
+            "WHERE plan_id = ? AND version = ?",
+            values + (plan_id, expected_version)
+        ).rowcount == 0:
+            return False
+        self.conn.execute("UPDATE tasks SET completed = 0 WHERE plan_id = ? AND completed = 1", (plan_id,))
+        self.conn.executemany(
+            "UPDATE tasks SET completed = 1 WHERE plan_id = ? AND idx = ?",
+            [(plan_id, idx) for idx in completed]
+        )
+        return True
+
+    @_synchronized
+    def get_plans(self):
+        """Get all study plans"""
+        return [
+            self._row_to_plan(row)
+            for row in self.conn.execute(f"SELECT * FROM plans {TASK_COUNT} ORDER BY plans.rowid")
+        ]
+
+    @_synchronized
+    def get_plan(self, plan_id):
+        """Get a specific study plan by ID"""
+        row = self.conn.execute(f"SELECT * FROM plans {TASK_COUNT} WHERE id = ?", (plan_id,)).fetchone()
+        if row is None:
+            return None
+        return self._row_to_plan(row)
+
+    @_synchronized
+    def add_plan(self, plan):
+        """Add a new study plan"""
+        with self.conn:
+            self._insert_plan(plan)
+        self.changes.publish("plan", plan["id"])
+        return plan["id"]
+
+    @_synchronized
+    def add_plans(self, plans):
+        """
+        Add many study plans, each with empty progress, in one transaction.
+
+        A plan whose id is already stored, or taken earlier in the batch, is
+        skipped rather than failing the whole batch.
+
+        Returns:
+            list: The id of each plan in order, or None where it was skipped
+        """
+        plan_ids = []
+        with self.conn:
+            for plan in plans:
+                if self.conn.execute("SELECT 1 FROM plans WHERE id = ?", (plan["id"],)).fetchone():
+                    plan_ids.append(None)
+                    continue
+                self._insert_plan(plan)
+                self._write_progress(plan["id"], {"total_tasks": len(plan["tasks"]), "completion_percentage": 0})
+                plan_ids.append(plan["id"])
+        for plan_id in plan_ids:
+            if plan_id is not None:
+                self.changes.publish("plan", plan_id)
+        return plan_ids
+
+    @_synchronized
+    def update_plan(self, plan_id, updated_plan, expected_version=None):
+        """
+        Update an existing study plan.
+
+        If expected_version is given, the update only applies when the stored
+        plan is still at that version, so concurrent editors cannot clobber
+        each other. Returns False when the plan is missing or has moved on.
+        """
+        with self.conn:
+            row = self.conn.execute("SELECT rowid, version FROM plans WHERE id = ?", (plan_id,)).fetchone()
+            if row is None:
+                return False
+            version = row["version"] or 0
+            if expected_version is not None and expected_version != version:
+                return False
+            updated_plan = dict(as_dict(updated_plan), version=version + 1)
+            completed = [
+                task_row["idx"] for task_row in self.conn.execute(
+                    "SELECT idx FROM tasks WHERE plan_id = ? AND completed = 1", (plan_id,)
+                )
+            ]
+            # Another connection may have updated the plan since we read it
+            if self.conn.execute(
+                "UPDATE plans SET id = ?, type = ?, created_at = ?, exam_date = ?, version = ?, extra = ? "
+                "WHERE rowid = ? AND COALESCE(version, 0) = ?",
+                self._plan_values(updated_plan) + [row["rowid"], version]
+            ).rowcount == 0:
+                return False
+            self.conn.execute("DELETE FROM tasks WHERE plan_id = ?", (plan_id,))
+            self._insert_tasks(updated_plan["id"], updated_plan.get("tasks", []), completed)
+        self.changes.publish("plan", plan_id)
+        return True
+
+    @_synchronized
+    def delete_plan(self, plan_id):
+        """Delete a study plan"""
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM plans WHERE id = ?", (plan_id,))
+            if cursor.rowcount == 0:
+                return False
+            self.conn.execute("DELETE FROM tasks WHERE plan_id = ?", (plan_id,))
+            self.conn.execute("DELETE FROM progress WHERE plan_id = ?", (plan_id,))
+        self.changes.publish("plan", plan_id)
+        self.changes.publish("progress", plan_id)
+        return True
+
+    @_synchronized
+    def get_progress(self, plan_id):
+        """Get progress for a specific plan"""
+        row = self.conn.execute("SELECT * FROM progress WHERE plan_id = ?", (plan_id,)).fetchone()
+        if row is None:
+            return {
+                "completed_tasks": [],
+                "total_tasks": 0,
+                "completion_percentage": 0
+            }
+        completed = self._completed(plan_id)
+        self._remember_progress(plan_id, row["version"], completed)
+        return {
+            "completed_tasks": completed,
+            "total_tasks": row["total_tasks"],
+            "completion_percentage": row["completion_percentage"],
+            "version": row["version"]
+        }
+
+    def _completed(self, plan_id):
+        """Completed task indices of a plan, in order"""
+        return [
+            task_row["idx"] for task_row in self.conn.execute(
+                "SELECT idx FROM tasks WHERE plan_id = ? AND completed = 1 ORDER BY idx", (plan_id,)
+            )
+        ]
+
+    def _remember_progress(self, plan_id, version, completed):
+        """Keep the completed set of a progress version for later merges"""
+        history = self._progress_history.setdefault(plan_id, {})
+        history[version] = frozenset(completed)
+        if len(history) > PROGRESS_HISTORY:
+            del history[next(iter(history))]
+
+    def _merge_progress(self, plan_id, progress, total_tasks):
+        """Three-way merge of a progress update based on an older version into the stored one"""
+        base = self._progress_history.get(plan_id, {}).get(progress["version"])
+        merged = _merge_completed(set(self._completed(plan_id)), set(progress.get("completed_tasks", [])), base)
+        total_tasks = progress.get("total_tasks") or total_tasks
+        return {
+            "completed_tasks": sorted(merged),
+            "total_tasks": total_tasks,
+            "completion_percentage": (len(merged) / total_tasks) * 100 if total_tasks else 0
+        }
+
+    @_synchronized
+    def update_progress(self, plan_id, progress):
+        """
+        Update progress for a specific plan.
+
+        Progress read through get_progress carries a version. If another
+        session has saved since then, the two sets of ticked and unticked
+        tasks are merged instead of the later write replacing the earlier.
+        Returns the progress as stored.
+        """
+        with self.conn:
+            while True:
+                row = self.conn.execute(
+                    "SELECT total_tasks, version FROM progress WHERE plan_id = ?", (plan_id,)
+                ).fetchone()
+                version = row["version"] if row else None
+                update = progress
+                if row and progress.get("version") is not None and progress["version"] != version:
+                    update = self._merge_progress(plan_id, progress, row["total_tasks"])
+                # The write is conditional on the version read above, so an
+                # update committed by another connection in between is merged too
+                if self._write_progress(plan_id, dict(update, version=(version or 0) + 1), version):
+                    break
+        self.changes.publish("progress", plan_id)
+        return self.get_progress(plan_id)
+
+    @_synchronized
+    def is_completed(self, plan_id, task_index):
+        """Check whether a task of a plan is completed"""
+        row = self.conn.execute(
+            "SELECT completed FROM tasks WHERE plan_id = ? AND idx = ?", (plan_id, task_index)
+        ).fetchone()
+        return bool(row and row["completed"])
+
+    @_synchronized
+    def count(self, plan_id):
+        """Get the number of completed tasks of a plan"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE plan_id = ? AND completed = 1", (plan_id,)
+        ).fetchone()[0]
+
+    @_synchronized
+    def toggle(self, plan_id, task_index, completed=None):
+        """Mark a single task completed or not (flip it when completed is None); returns the new state"""
+        with self.conn:
+            if completed is None:
+                completed = not self.is_completed(plan_id, task_index)
+            self.conn.execute(
+                "UPDATE tasks SET completed = ? WHERE plan_id = ? AND idx = ?",
+                (int(bool(completed)), plan_id, task_index)
+            )
+            self._refresh_completion(plan_id)
+        self.changes.publish("progress", plan_id)
+        return bool(completed)
+
+    @_synchronized
+    def set_completed(self, plan_id, changes):
+        """
+        Apply many task completion changes ({task index: completed}) in one transaction.
+
+        Only the given tasks are written, so other sessions' ticks are kept.
+        Returns the progress as stored.
+        """
+        if changes:
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE tasks SET completed = ? WHERE plan_id = ? AND idx = ?",
+                    [(int(bool(completed)), plan_id, index) for index, completed in changes.items()]
+                )
+                self._refresh_completion(plan_id)
+            self.changes.publish("progress", plan_id)
+        return self.get_progress(plan_id)
+
+    def _refresh_completion(self, plan_id):
+        """Recompute a plan's completion percentage from its task rows and bump the progress version"""
+        total_tasks = self.conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE plan_id = ?", (plan_id,)
+        ).fetchone()[0]
+        self.conn.execute(
+            "INSERT INTO progress (plan_id, total_tasks, completion_percentage) VALUES (?, ?, 0) "
+            "ON CONFLICT (plan_id) DO NOTHING",
+            (plan_id, total_tasks)
+        )
+        self.conn.execute(
+            "UPDATE progress SET version = version + 1, completion_percentage = CASE WHEN total_tasks > 0 "
+            "THEN 100.0 * (SELECT COUNT(*) FROM tasks WHERE plan_id = ? AND completed = 1) / total_tasks "
+            "ELSE 0 END WHERE plan_id = ?",
+            (plan_id, plan_id)
+        )
+
+    @_synchronized
+    def get_calendar_events(self):
+        """Get all calendar events"""
+        return [
+            self._event_row_to_dict(row)
+            for row in self.conn.execute("SELECT * FROM calendar_events ORDER BY rowid")
+        ]
+
+    @_synchronized
+    def add_calendar_event(self, event):
+        """Add a new calendar event"""
+        with self.conn:
+            self._insert_event(event)
+        self.changes.publish("event", event["id"])
+        return event["id"]
+
+    @_synchronized
+    def delete_calendar_event(self, event_id):
+        """Delete a calendar event"""
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM calendar_events WHERE id = ?", (event_id,))
+        if cursor.rowcount == 0:
+            return False
+        self.changes.publish("event", event_id)
+        return True
+
+    def _event_row_to_dict(self, row):
+        """Build an event dict from a calendar_events row"""
+        return _merge_extra({column: row[column] for column in EVENT_COLUMNS}, row["extra"])
+
+    def _task_row_to_entry(self, row):
+        """Calendar-style view of a dated plan task row"""
+        entry = self._row_to_task(row)
+        entry.update({
+            "id": f"{row['plan_id']}:{row['idx']}",
+            "title": f"{row['subject'] or ''}: {row['description'] or ''}",
+            "plan_id": row["plan_id"],
+            "task_index": row["idx"]
+        })
+        return entry
+
+    def _dated(self, where, params, include_tasks, limit):
+        """Events (and optionally tasks) matching a date condition, in date order via the date indexes"""
+        suffix = " ORDER BY date, COALESCE(start_time, '')" + (" LIMIT ?" if limit is not None else "")
+        params = tuple(params) + ((limit,) if limit is not None else ())
+        events = (
+            ((row["date"], row["start_time"] or "", 0), self._event_row_to_dict(row))
+            for row in self.conn.execute(f"SELECT * FROM calendar_events WHERE {where}{suffix}", params)
+        )
+        if not include_tasks:
+            return [event for _, event in events]
+        tasks = (
+            ((row["date"], row["start_time"] or "", 1), self._task_row_to_entry(row))
+            for row in self.conn.execute(f"SELECT * FROM tasks WHERE {where}{suffix}", params)
+        )
+        merged = [entry for _, entry in heapq.merge(events, tasks, key=lambda item: item[0])]
+        return merged[:limit] if limit is not None else merged
+
+    @_synchronized
+    def events_between(self, start, end, include_tasks=False):
+        """Get calendar events (and optionally dated plan tasks) from start to end inclusive, in date order"""
+        return self._dated("date BETWEEN ? AND ?", (_date_key(start), _date_key(end)), include_tasks, None)
+
+    @_synchronized
+    def upcoming(self, limit=None, today=None, include_tasks=False):
+        """Get calendar events (and optionally dated plan tasks) from today onwards, in date order"""
+        today = _date_key(today or datetime.now().date())
+        return self._dated("date >= ?", (today,), include_tasks, limit)
+
+    @_synchronized
+    def get_plan_stats(self, plan_id):
+        """Get the task and completed-task counts of a plan"""
+        row = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(completed), 0) FROM tasks WHERE plan_id = ?", (plan_id,)
+        ).fetchone()
+        return {"total_tasks": row[0], "completed_tasks": row[1]}
+
+    @_synchronized
+    def get_insights(self):
+        """
+        Get the running progress aggregates used by the Insights page.
+
+        The per-subject counts are kept up to date by triggers as tasks
+        change, so this reads one row per subject rather than every task.
+        """
+        total_plans = self.conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+        total_tasks = completed_tasks = 0
+        subjects = {}
+        for row in self.conn.execute("SELECT subject, total, completed FROM task_stats ORDER BY first_rowid"):
+            total_tasks += row["total"]
+            completed_tasks += row["completed"]
+            if row["subject"] not in ("", "Break"):
+                subjects[row["subject"]] = {"total": row["total"], "completed": row["completed"]}
+        return {
+            "total_plans": total_plans,
+            "total_tasks": total_tasks,
+            "completed_tasks": completed_tasks,
+            "completion_rate": (completed_tasks / total_tasks) * 100 if total_tasks > 0 else 0,
+            "subjects": subjects
+        }
+
+    @_synchronized
+    def get_user_preferences(self):
+        """Get user preferences"""
+        return {
+            row["key"]: json.loads(row["value"])
+            for row in self.conn.execute("SELECT key, value FROM user_preferences")
+        }
+
+    @_synchronized
+    def update_user_preferences(self, preferences):
+        """Update user preferences"""
+        with self.conn:
+            self.conn.execute("DELETE FROM user_preferences")
+            self.conn.executemany(
+                "INSERT INTO user_preferences (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in preferences.items()]
+            )
+        self.changes.publish("preferences")
+
+    @_synchronized
+    def clear_all_data(self):
+        """Clear all data"""
+        with self.conn:
+            for table in ("plans", "tasks", "progress", "calendar_events", "user_preferences"):
+                self.conn.execute(f"DELETE FROM {table}")
+        self.changes.publish("all")
+
+    @_synchronized
+    def import_data(self, data):
+        """Import a JSON-format database dict in a single transaction"""
+        with self.conn:
+            for plan in data.get("plans", []):
+                self._insert_plan(plan)
+            for plan_id, progress in data.get("progress", {}).items():
+                self._write_progress(plan_id, progress)
+            for event in data.get("calendar_events", []):
+                self._insert_event(event)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO user_preferences (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in data.get("user_preferences", {}).items()]
+            )
+        self.changes.publish("all")
+
+
+def migrate_json_to_sqlite(json_path="study_planner.json", sqlite_path="study_planner.db"):
+    """
+    Copy an existing JSON database into a new SQLite database.
+
+    The migration is one-shot: it refuses to run if the SQLite database
+    already contains plans or events, so it can never duplicate records.
+
+    Returns:
+        dict: Number of plans and calendar events migrated
+    """
+    from database import Database
+
+    data = Database(json_path).export_data()
+    db = SQLiteDatabase(sqlite_path)
+    try:
+        existing = db.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM plans) + (SELECT COUNT(*) FROM calendar_events)"
+        ).fetchone()[0]
+        if existing:
+            raise ValueError(f"{sqlite_path} already contains data; refusing to migrate twice")
+        db.import_data(data)
+    finally:
+        db.close()
+    return {
+        "plans": len(data.get("plans", [])),
+        "calendar_events": len(data.get("calendar_events", []))
+    }
+
+
+if __name__ == "__main__":
+    json_path = sys.argv[1] if len(sys.argv) > 1 else "study_planner.json"
+    sqlite_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(json_path)[0] + ".db"
+    counts = migrate_json_to_sqlite(json_path, sqlite_path)
+    print(f"Migrated {counts['plans']} plans and {counts['calendar_events']} events to {sqlite_path}")
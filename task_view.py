@@ -0,0 +1,70 @@
+# Filtering and paging for the task list of a plan
+#
+# Streamlit builds every widget on every rerun, so display_plan renders only
+# one page of tasks. The helpers here work on task indices (a task's index is
+# its identity for progress and widget keys) and never touch Streamlit.
+
+# Page sizes offered by the task list
+PAGE_SIZES = (25, 50, 100)
+
+# Status filter choices
+STATUSES = ("All", "Open", "Done")
+
+def task_days(tasks):
+    """Distinct task dates in order"""
+    return sorted({task['date'] for task in tasks if 'date' in task})
+
+def task_subjects(tasks):
+    """Distinct task subjects in order"""
+    return sorted({task['subject'] for task in tasks if 'subject' in task})
+
+def filter_tasks(tasks, completed, day=None, subjects=(), status="All"):
+    """
+    Get the indices of the tasks matching the filters.
+
+    Args:
+        tasks (list): The plan's tasks
+        completed (set): Indices of completed tasks
+        day (str): Only tasks on this YYYY-MM-DD date, if given
+        subjects (iterable): Only tasks of these subjects, if any are given
+        status (str): "All", "Open" or "Done"
+
+    Returns:
+        list: Matching task indices in plan order
+    """
+    subjects = set(subjects)
+    indices = []
+    for i, task in enumerate(tasks):
+        if day is not None and task.get('date') != day:
+            continue
+        if subjects and task.get('subject') not in subjects:
+            continue
+        if status == "Open" and i in completed or status == "Done" and i not in completed:
+            continue
+        indices.append(i)
+    return indices
+
+def page_count(total, page_size):
+    """Number of pages needed for total items; at least one"""
+    return max(1, -(-total // page_size))
+
+def page_slice(indices, page, page_size):
+    """The indices on a 1-based page, with out-of-range pages clamped"""
+    page = min(max(1, page), page_count(len(indices), page_size))
+    return indices[(page - 1) * page_size:page * page_size]
+
+def group_by_day(tasks, indices):
+    """
+    Group task indices by date, keeping their order.
+
+    Returns:
+        list: (date or None for undated tasks, list of indices) pairs
+    """
+    groups = []
+    for i in indices:
+        day = tasks[i].get('date')
+        if groups and groups[-1][0] == day:
+            groups[-1][1].append(i)
+        else:
+            groups.append((day, [i]))
+    return groups
@@ -0,0 +1,35 @@
+from datetime import date
+
+import pytest
+
+from database import Database
+from planners import GenerationContext, generate_plan
+from sqlite_database import SQLiteDatabase
+
+TODAY = date(2026, 10, 1)
+
+EXAM_INPUTS = {"subjects": ["Math", "History"], "exam_date": "2026-10-20"}
+
+@pytest.fixture(params=["json", "sqlite"])
+def open_db(request, tmp_path):
+    """Opens a store of each backend in tmp_path; every call is another handle on the same store"""
+    def open_db():
+        if request.param == "json":
+            return Database(str(tmp_path / "store.json"))
+        db = SQLiteDatabase(str(tmp_path / "store.db"))
+        request.addfinalizer(db.close)
+        return db
+    return open_db
+
+@pytest.fixture
+def db(open_db):
+    return open_db()
+
+@pytest.fixture
+def make_plan():
+    """Generates a plan as of TODAY; plans of different seeds get different ids"""
+    def make_plan(plan_type="exam_time", seed=0, **inputs):
+        context = GenerationContext.deterministic(seed, TODAY, id_prefix=f"{seed}_")
+        defaults = EXAM_INPUTS if plan_type == "exam_time" else {}
+        return generate_plan(plan_type, dict(defaults, **inputs, context=context), use_cache=False)
+    return make_plan
@@ -0,0 +1,21 @@
+from datetime import date
+
+import pytest
+
+from batch import run_batch
+
+SPECS = [
+    {"student": "s001", "type": "exam", "subjects": ["Math", "History"], "exam_date": "2026-11-20"},
+    {"student": "s002", "type": "quick", "subjects": ["Physics"], "topics": {"Physics": ["Optics"]}},
+]
+
+def test_seeded_rerun_reports_existing_plans(db):
+    first = run_batch(SPECS, db, workers=1, seed="7", today=date(2026, 10, 1))
+    plans = [plan.to_dict() for plan in db.get_plans()]
+
+    second = run_batch(SPECS, db, workers=1, seed="7", today=date(2026, 10, 1))
+
+    assert first["plans"] == 2 and not first["errors"]
+    assert second["plans"] == 0
+    assert [index for index, error in second["errors"]] == [0, 1]
+    assert [plan.to_dict() for plan in db.get_plans()] == plans
@@ -0,0 +1,10 @@
+from calendar_view import MonthCalendar
+
+def test_month_shows_events_added_by_another_process(open_db):
+    db, other = open_db(), open_db()
+    month_calendar = MonthCalendar(db)
+    assert "Exam" not in month_calendar.render(2026, 10)
+
+    other.add_calendar_event({"id": "e1", "title": "Exam", "date": "2026-10-20"})
+
+    assert "Exam" in month_calendar.render(2026, 10)
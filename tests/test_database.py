@@ -0,0 +1,94 @@
+import os
+import threading
+
+from database import Database, DateIndex
+from models import Plan, Task
+
+def test_readers_do_not_wait_for_a_writer(tmp_path):
+    db = Database(str(tmp_path / "store.json"))
+    db.add_calendar_event({"id": "e1", "title": "Exam", "date": "2026-10-20"})
+    holding = threading.Event()
+    release = threading.Event()
+
+    def write():
+        with db._write_lock():
+            holding.set()
+            release.wait(5)
+    writer = threading.Thread(target=write)
+    writer.start()
+    holding.wait(5)
+    result = []
+    reader = threading.Thread(target=lambda: result.append(db.get_calendar_events()))
+    reader.start()
+    reader.join(1)
+    finished = not reader.is_alive()
+    release.set()
+    writer.join()
+    reader.join()
+
+    assert finished
+    assert [event["id"] for event in result[0]] == ["e1"]
+
+def test_compaction_retries_files_it_could_not_remove(tmp_path, monkeypatch):
+    db = Database(str(tmp_path / "store.json"))
+    db.add_calendar_event({"id": "e1", "title": "Exam", "date": "2026-10-20"})
+    remove = os.remove
+
+    def refuse(path):
+        # What Windows does with a file another handle still has open
+        raise PermissionError(path)
+    monkeypatch.setattr(os, "remove", refuse)
+    db.compact()
+    monkeypatch.setattr(os, "remove", remove)
+    assert os.path.exists(tmp_path / "store.json.journal")
+
+    db.compact()
+
+    assert sorted(os.listdir(tmp_path)) == ["store.json", "store.json.bodies.2", "store.json.lock"]
+    assert [event["id"] for event in Database(str(tmp_path / "store.json")).get_calendar_events()] == ["e1"]
+
+def test_date_index_ranges():
+    index = DateIndex([("2026-10-01", "09:00", "a"), ("2026-10-02", "", "b"), ("2026-10-02", "10:00", "c"),
+                       ("2026-10-05", "08:00", "d")])
+
+    assert [key[2] for key in index.between("2026-10-02", "2026-10-04")] == ["b", "c"]
+    assert [key[2] for key in index.between("2026-10-01", "2026-10-01")] == ["a"]
+    assert [key[2] for key in index.since("2026-10-03")] == ["d"]
+    assert list(index.since("2026-11-01")) == []
+
+def _event(event_id):
+    return {"id": event_id, "title": event_id, "date": "2026-10-20"}
+
+def test_a_torn_last_journal_line_is_ignored(tmp_path):
+    path = str(tmp_path / "store.json")
+    Database(path).add_calendar_event(_event("e1"))
+    # A writer crashed half way through its record
+    with open(path + ".journal", "ab") as f:
+        f.write(b'{"op":"add_event","event":{"id":"e2","ti')
+
+    db = Database(path)
+    assert [event["id"] for event in db.get_calendar_events()] == ["e1"]
+
+    # The next writer cuts the torn bytes off before appending
+    db.add_calendar_event(_event("e3"))
+    assert [event["id"] for event in Database(path).get_calendar_events()] == ["e1", "e3"]
+
+def test_compaction_across_generations_with_another_instance_open(tmp_path):
+    path = str(tmp_path / "store.json")
+    writer = Database(path, compact_threshold=3)
+    reader = Database(path)
+    plan = Plan("p1", "Exam Time", "2026-10-01 00:00", [Task(0, "Math", "Read", 480, 540, "study", "High",
+                                                             "2026-10-02", {"room": "A"})])
+    writer.add_plan(plan)
+    stored = reader.get_plan("p1")
+
+    for i in range(10):
+        writer.add_calendar_event(_event(f"e{i}"))
+    assert writer.generation >= 3
+
+    # The reader follows the new generations and can still load bodies it listed earlier
+    assert [event["id"] for event in reader.get_calendar_events()] == [f"e{i}" for i in range(10)]
+    assert stored.to_dict() == plan.to_dict()
+    reader.delete_calendar_event("e0")
+    assert [event["id"] for event in writer.get_calendar_events()] == [f"e{i}" for i in range(1, 10)]
+    assert Database(path).get_plan("p1").to_dict() == plan.to_dict()
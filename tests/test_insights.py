@@ -0,0 +1,39 @@
+import sqlite3
+
+from database import Database
+from sqlite_database import SQLiteDatabase
+
+def _exercise(db, make_plan):
+    first, second = make_plan(seed=1), make_plan(seed=2, subjects=["Biology"])
+    db.add_plans([first, second])
+    db.toggle(first.id, 0, True)
+    db.set_completed(first.id, {1: True, 2: True})
+    db.update_progress(second.id, dict(db.get_progress(second.id), completed_tasks=[0, 3]))
+    db.update_plan(first.id, dict(make_plan(seed=3, subjects=["Math", "Chemistry"]).to_dict(), id=first.id))
+    db.toggle(first.id, 1, False)
+    db.delete_plan(second.id)
+    return db.get_insights()
+
+def test_sqlite_insights_match_the_json_store(tmp_path, make_plan):
+    sqlite_db = SQLiteDatabase(str(tmp_path / "store.db"))
+    try:
+        assert _exercise(sqlite_db, make_plan) == _exercise(Database(str(tmp_path / "store.json")), make_plan)
+    finally:
+        sqlite_db.close()
+
+def test_sqlite_insights_count_tasks_stored_before_the_stats_table(tmp_path, make_plan):
+    path = str(tmp_path / "store.db")
+    db = SQLiteDatabase(path)
+    db.add_plans([make_plan(seed=1)])
+    expected = db.get_insights()
+    db.close()
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM task_stats")
+    conn.commit()
+    conn.close()
+
+    db = SQLiteDatabase(path)
+    try:
+        assert db.get_insights() == expected
+    finally:
+        db.close()
@@ -0,0 +1,32 @@
+import random
+
+from intervals import BusyIndex
+
+def _free_slots_by_scan(intervals, min_len, windows):
+    """Free gaps found minute by minute"""
+    busy = set()
+    for start, end in intervals:
+        busy.update(range(start, end))
+    slots = []
+    for start, end in sorted(windows):
+        run = None
+        for minute in range(start, end + 1):
+            if minute < end and minute not in busy:
+                run = minute if run is None else run
+            elif run is not None:
+                if minute - run >= min_len:
+                    slots.append((run, minute))
+                run = None
+    return slots
+
+def test_free_slots_follow_adds_to_the_day():
+    rng = random.Random(0)
+    index = BusyIndex()
+    intervals = []
+    windows = [(480, 720), (780, 1020), (1080, 1320)]
+    for _ in range(40):
+        start = rng.randrange(0, 1400)
+        interval = (start, start + rng.randrange(5, 90))
+        index.add("2026-10-01", *interval)
+        intervals.append(interval)
+        assert index.free_slots("2026-10-01", 20, windows) == _free_slots_by_scan(intervals, 20, windows)
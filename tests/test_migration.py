@@ -0,0 +1,20 @@
+from database import Database
+from sqlite_database import SQLiteDatabase, migrate_json_to_sqlite
+
+def test_migration_keeps_completed_tasks(tmp_path, make_plan):
+    json_db = Database(str(tmp_path / "store.json"))
+    plan = make_plan()
+    json_db.add_plan(plan)
+    for i in (0, 1, 2):
+        json_db.toggle(plan.id, i, True)
+
+    migrate_json_to_sqlite(str(tmp_path / "store.json"), str(tmp_path / "store.db"))
+
+    sqlite_db = SQLiteDatabase(str(tmp_path / "store.db"))
+    try:
+        assert sqlite_db.get_progress(plan.id)["completed_tasks"] == [0, 1, 2]
+        assert sqlite_db.get_insights()["completed_tasks"] == 3
+        assert [task.to_dict() for task in sqlite_db.get_plan(plan.id).tasks] == \
+            [task.to_dict() for task in plan.tasks]
+    finally:
+        sqlite_db.close()
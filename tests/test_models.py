@@ -0,0 +1,30 @@
+import threading
+
+from models import Plan
+
+def test_loading_a_plan_body_does_not_block_other_plans():
+    store_lock = threading.Lock()
+    loading = threading.Event()
+    converted = threading.Event()
+
+    def load():
+        # Like a store's loader: needs the store lock
+        loading.set()
+        with store_lock:
+            return [], [], []
+    waiting = Plan.from_header({"id": "p1", "task_count": 0}, load)
+    other = Plan.from_header({"id": "p2", "task_count": 0}, lambda: ([], [], []))
+
+    def update_plan():
+        # Like a store method: holds the store lock while it reads a plan body
+        with store_lock:
+            threading.Thread(target=lambda: waiting.tasks, daemon=True).start()
+            loading.wait(5)
+            other.to_dict()
+            converted.set()
+    store_thread = threading.Thread(target=update_plan, daemon=True)
+    store_thread.start()
+    store_thread.join(2)
+
+    assert converted.is_set()
+    assert other.loaded
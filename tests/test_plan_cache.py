@@ -0,0 +1,36 @@
+from datetime import date
+
+from database import Database
+from intervals import BusyIndex
+from planners import GenerationContext, generate_plan
+from planners.cache import cache_key, plan_cache
+
+CONTEXT = GenerationContext.deterministic(0, date(2026, 10, 1))
+
+def _key(**inputs):
+    return cache_key("exam_time", dict({"subjects": ["Math"], "special_events": "", "priority_settings": ""},
+                                       **inputs), CONTEXT)
+
+def test_subject_whitespace_changes_the_key():
+    assert _key(subjects=["Math "]) != _key(subjects=["Math"])
+
+def test_whitespace_around_parsed_lines_does_not_change_the_key():
+    assert _key(priority_settings="  Math: High \n") == _key(priority_settings="Math: High")
+    assert _key(special_events="\nTrip, 2026-10-05, 3 \n") == _key(special_events="Trip, 2026-10-05, 3")
+
+def test_resubmitting_a_saved_plan_hits_the_cache(tmp_path):
+    db = Database(str(tmp_path / "store.json"))
+    db.add_calendar_event({"id": "e1", "title": "Dentist", "date": "2026-10-02",
+                           "start_time": "09:00", "end_time": "10:00"})
+    plan_cache.clear()
+    plans = []
+    # What the Exam Time form does on each submit: busy time from the store, generate, save
+    for _ in range(2):
+        busy = BusyIndex.from_database(db, CONTEXT.today(), date(2026, 10, 20))
+        plan = generate_plan("exam_time", {"subjects": ["Math", "History"], "exam_date": "2026-10-20",
+                                           "busy": busy, "context": CONTEXT})
+        db.add_plan(plan)
+        plans.append(plan)
+
+    assert plan_cache.stats()["hits"] == 1
+    assert [task.to_dict() for task in plans[1].tasks] == [task.to_dict() for task in plans[0].tasks]
@@ -0,0 +1,20 @@
+from models import Task
+from plan_codec import decode_body, encode_body
+
+def test_round_trip_keeps_every_task_field():
+    tasks = [
+        Task(0, "Math", "Algebra", "09:00", "10:30", "study", "High", "2026-10-02"),
+        Task(1, "Math", "Break", "10:30", "10:45", "break", "Low", "2026-10-02"),
+        # Unscheduled task, extra keys and an id the id column cannot hold
+        Task("review-1", "History", "Read notes", extra={"topic": "WW1", "pages": [3, 4]}),
+        Task(2 ** 31, None, None, "00:00", "24:00", date="2026-10-03", extra={"room": "B2"}),
+    ]
+    decoded, techniques, resources = decode_body(encode_body(tasks, ["Pomodoro"], [{"name": "Book"}]))
+
+    assert [task.to_dict() for task in decoded] == [task.to_dict() for task in tasks]
+    assert [task.extra for task in decoded] == [None, None, {"topic": "WW1", "pages": [3, 4]}, {"room": "B2"}]
+    assert techniques == ["Pomodoro"]
+    assert resources == [{"name": "Book"}]
+
+def test_round_trip_of_an_empty_body():
+    assert decode_body(encode_body([], [], [])) == ([], [], [])
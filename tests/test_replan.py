@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+
+from database import Database
+from planners import replan
+
+def _overlaps(tasks):
+    """Pairs of dated tasks whose times overlap"""
+    timed = sorted(
+        (task.date, task.start, task.end, i) for i, task in enumerate(tasks)
+        if task.date and task.start is not None
+    )
+    return [
+        (a[3], b[3]) for a, b in zip(timed, timed[1:])
+        if a[0] == b[0] and b[1] < a[2]
+    ]
+
+def _store_plan(tmp_path, plan, completed=()):
+    db = Database(str(tmp_path / "store.json"))
+    db.add_plan(plan)
+    for i in completed:
+        db.toggle(plan.id, i, True)
+    return db
+
+def test_replan_exam_plan_has_no_overlaps(tmp_path, make_plan):
+    plan = make_plan("exam_time", subjects=["Math", "Biology", "Chemistry"], exam_date="2026-12-20", daily_hours=3)
+    db = _store_plan(tmp_path, plan, completed=range(10))
+    before = [task.to_dict() for task in plan.tasks]
+
+    updated, unscheduled = replan(db, plan.id, date(2026, 10, 20))
+
+    tasks = db.get_plan(plan.id).tasks
+    assert len(tasks) == len(before)
+    assert [task.to_dict() for task in tasks[:10]] == before[:10]
+    assert not _overlaps(tasks)
+    # The plan filled every day, so overdue sessions cannot move and future ones keep their slots
+    assert all(tasks[i].to_dict() == before[i] for i in range(len(tasks)) if before[i]["date"] >= "2026-10-20")
+    assert unscheduled and all(tasks[i].date < "2026-10-20" for i in unscheduled)
+
+def test_replan_moves_overdue_sessions_before_the_due_date(tmp_path, make_plan):
+    plan = make_plan(
+        "submissions", assignments=["Essay", "Lab report"],
+        due_dates={"Essay": "2026-10-12", "Lab report": "2026-10-30"},
+        complexity={"Essay": 5, "Lab report": 4}
+    )
+    db = _store_plan(tmp_path, plan, completed=(0,))
+    before = [task.to_dict() for task in plan.tasks]
+
+    updated, unscheduled = replan(db, plan.id, date(2026, 10, 5))
+
+    tasks = db.get_plan(plan.id).tasks
+    assert not unscheduled
+    assert not _overlaps(tasks)
+    assert tasks[0].to_dict() == before[0]
+    moved = [i for i, task in enumerate(tasks) if task.to_dict() != before[i]]
+    assert moved and all(before[i]["date"] < "2026-10-05" <= tasks[i].date for i in moved)
+    assert all(task.date < "2026-10-12" for task in tasks if task.subject == "Essay")
+
+def test_replan_moves_breaks_with_their_sessions(tmp_path, make_plan):
+    plan = make_plan(
+        "quick_study", subjects=["Math", "Physics"],
+        topics={"Math": ["Algebra", "Calculus", "Geometry"], "Physics": ["Optics", "Waves"]},
+        start_time="09:00", end_time="13:00", days=2
+    )
+    db = _store_plan(tmp_path, plan, completed=(0, 1))
+
+    updated, unscheduled = replan(db, plan.id, date(2026, 10, 3))
+
+    tasks = db.get_plan(plan.id).tasks
+    assert not unscheduled
+    assert not _overlaps(tasks)
+    moved = [i for i, task in enumerate(tasks) if task.to_dict() != plan.tasks[i].to_dict()]
+    assert moved and all(tasks[i].date >= "2026-10-03" for i in moved)
+    for i, task in enumerate(tasks):
+        if task.type == "break" and i - 1 not in unscheduled and i not in (0, 1):
+            assert tasks[i - 1].type != "break"
+            assert (tasks[i - 1].date, tasks[i - 1].end) == (task.date, task.start)
+
+def test_replan_refuses_to_overwrite_a_concurrent_edit(tmp_path, make_plan):
+    plan = make_plan("submissions", assignments=["Essay"], due_dates={"Essay": "2026-10-12"}, complexity={"Essay": 5})
+    db = _store_plan(tmp_path, plan)
+    edited = dict(plan.to_dict(), tasks=plan.to_dict()["tasks"][:1])
+    get_progress = db.get_progress
+
+    def edit_then_get_progress(plan_id):
+        # Another session saves the plan after replan has read it
+        db.update_plan(plan_id, edited)
+        return get_progress(plan_id)
+    db.get_progress = edit_then_get_progress
+
+    with pytest.raises(ValueError):
+        replan(db, plan.id, date(2026, 10, 5))
+    assert len(db.get_plan(plan.id).tasks) == 1
@@ -0,0 +1,55 @@
+from datetime import date
+
+from intervals import BusyIndex
+from scheduler import Demand, Timeline
+
+MORNING = [(540, 720)]
+
+def _sessions(sessions):
+    return [(demand.key, str(day), start, end) for demand, day, start, end in sessions]
+
+def test_earliest_deadline_is_packed_first_around_busy_time():
+    busy = BusyIndex()
+    busy.add("2026-10-05", 600, 660)
+    exam = Demand("exam", 240, deadline=date(2026, 10, 7))
+    reading = Demand("reading", 120)
+    timeline = Timeline(date(2026, 10, 5), date(2026, 10, 7), MORNING, busy=busy)
+
+    assert _sessions(timeline.schedule([reading, exam])) == [
+        ("exam", "2026-10-05", 540, 600),
+        ("exam", "2026-10-05", 660, 720),
+        ("exam", "2026-10-06", 540, 600),
+        ("exam", "2026-10-06", 600, 660),
+        ("reading", "2026-10-06", 660, 720),
+        ("reading", "2026-10-07", 540, 600),
+    ]
+    assert exam.remaining == reading.remaining == 0
+
+def test_sessions_are_never_placed_on_or_after_the_deadline():
+    demand = Demand("essay", 600, deadline=date(2026, 10, 6))
+    timeline = Timeline(date(2026, 10, 5), date(2026, 10, 9), MORNING)
+
+    assert {str(day) for _, day, _, _ in timeline.schedule([demand])} == {"2026-10-05"}
+    assert demand.remaining == 420
+
+def test_work_rolls_over_day_boundaries_and_into_overflow_days():
+    demand = Demand("quick", 300, session=90)
+    # Friday to Saturday, growing up to the next Tuesday; weekends are skipped
+    timeline = Timeline(date(2026, 10, 9), date(2026, 10, 10), MORNING, daily_limit=120,
+                        skip_weekends=True, overflow_until=date(2026, 10, 13))
+
+    assert _sessions(timeline.schedule([demand], gap=15)) == [
+        ("quick", "2026-10-09", 540, 630),
+        ("quick", "2026-10-09", 645, 675),
+        ("quick", "2026-10-12", 540, 630),
+        ("quick", "2026-10-12", 645, 675),
+        ("quick", "2026-10-13", 540, 600),
+    ]
+
+def test_busy_time_on_one_day_does_not_leak_into_the_next():
+    busy = BusyIndex()
+    busy.add("2026-10-05", 540, 720)
+    demand = Demand("exam", 60, deadline=date(2026, 10, 7))
+    timeline = Timeline(date(2026, 10, 5), date(2026, 10, 6), MORNING, busy=busy)
+
+    assert _sessions(timeline.schedule([demand])) == [("exam", "2026-10-06", 540, 600)]
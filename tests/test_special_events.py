@@ -0,0 +1,60 @@
+from datetime import date
+
+import pytest
+
+from special_events import parse_special_events
+
+TODAY = date(2026, 10, 1)
+
+def _blocked(text):
+    blocked, errors = parse_special_events(text, TODAY)
+    assert not errors
+    return [(str(interval.date), interval.start, interval.end) for interval in blocked]
+
+def test_a_bare_number_duration_is_hours():
+    assert _blocked("Study group, 2026-10-22 19:00, 2") == [("2026-10-22", 19 * 60, 21 * 60)]
+    assert _blocked("Study group, 2026-10-22 19:00, 1.5") == [("2026-10-22", 19 * 60, 20 * 60 + 30)]
+    # Without a start time the whole day is blocked, as with '3h'
+    assert _blocked("Trip, 2026-10-05, 3") == _blocked("Trip, 2026-10-05, 3h") == [("2026-10-05", 0, 24 * 60)]
+
+def test_24_00_ends_the_day():
+    assert _blocked("Party, 2026-10-31 20:00-24:00") == [("2026-10-31", 20 * 60, 24 * 60)]
+    assert _blocked("Party, 2026-10-31, 20:00-24:00") == [("2026-10-31", 20 * 60, 24 * 60)]
+    assert parse_special_events("Party, 2026-10-31 24:00, 1h", TODAY)[1]
+
+@pytest.mark.parametrize("text, expected", [
+    ("Math exam, 2026-10-20 09:00, 3h", [("2026-10-20", 540, 720)]),
+    ("Dentist, 2026-10-21 14:00-15:30", [("2026-10-21", 840, 930)]),
+    ("Dentist, 2026-10-21, 14:00 to 15:30", [("2026-10-21", 840, 930)]),
+    ("Football, today 18:00, 1h30m", [("2026-10-01", 1080, 1170)]),
+    ("Call, tomorrow 08:00, 45 min", [("2026-10-02", 480, 525)]),
+    ("Trip, 2026-10-24 to 2026-10-25", [("2026-10-24", 0, 1440), ("2026-10-25", 0, 1440)]),
+    ("Visit, 2026-11-02, 2 days", [("2026-11-02", 0, 1440), ("2026-11-03", 0, 1440)]),
+    ("Fair, 2026-10-05, all day", [("2026-10-05", 0, 1440)]),
+    ("Night shift, 2026-10-05 22:00, 4h", [("2026-10-05", 1320, 1440), ("2026-10-06", 0, 120)]),
+    ("Camp, 2026-10-05 18:00, 2d", [("2026-10-05", 1080, 1440), ("2026-10-06", 0, 1440)]),
+])
+def test_accepted_lines(text, expected):
+    assert _blocked(text) == expected
+
+@pytest.mark.parametrize("text, message", [
+    ("Math exam", "expected 'Event, Date[, Duration]'"),
+    (", 2026-10-20", "expected 'Event, Date[, Duration]'"),
+    ("Exam, 2026-10-20, 3h, room 4", "too many commas"),
+    ("Exam, next week", "unrecognised date"),
+    ("Exam, 2026-02-30", "invalid date"),
+    ("Exam, 2026-10-20 25:00, 1h", "invalid time"),
+    ("Exam, 2026-10-20 09:75, 1h", "invalid time"),
+    ("Exam, 2026-10-20 24:00, 1h", "invalid time"),
+    ("Exam, 2026-10-20 09:00, soon", "unrecognised duration"),
+    ("Exam, 2026-10-20 09:00, 0", "unrecognised duration"),
+    ("Exam, 2026-10-20 09:00", "add an end time or a duration"),
+    ("Exam, 2026-10-20 10:00-09:00", "end time must be after start time"),
+    ("Trip, 2026-10-26 to 2026-10-24", "the range ends before it starts"),
+    ("Trip, 2026-10-24 to 2026-10-26, 2 days", "not both"),
+    ("Trip, 2026-01-01 to 2027-06-01", "spans more than"),
+])
+def test_rejected_lines(text, message):
+    blocked, errors = parse_special_events(text, today=TODAY)
+    assert blocked == []
+    assert len(errors) == 1 and errors[0].startswith("Line 1") and message in errors[0]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from utils import apportion_days, calculate_study_distribution
+
+def _reference(weights, days):
+    """Largest-remainder apportionment of one student's days, one subject at a time"""
+    if days < len(weights):
+        heaviest = sorted(range(len(weights)), key=lambda j: (-weights[j], j))[:days]
+        return [int(j in heaviest) for j in range(len(weights))]
+    total = sum(weights)
+    excess = [max(weight / total * days - 1, 0) for weight in weights]
+    quota = [value / sum(excess) * (days - len(weights)) if sum(excess) else 0 for value in excess]
+    allocation = [int(q) for q in quota]
+    order = sorted(range(len(weights)), key=lambda j: (-(quota[j] - allocation[j]), -weights[j], j))
+    for j in order[:days - len(weights) - sum(allocation)]:
+        allocation[j] += 1
+    return [1 + value for value in allocation]
+
+@pytest.mark.parametrize("weights, days, expected", [
+    # Equal remainders go to the earlier subject
+    ([1, 1, 1], 10, [4, 3, 3]),
+    # ... unless a heavier subject shares the remainder
+    ([1, 3, 1, 3], 12, [1, 5, 1, 5]),
+    ([2, 1, 1], 5, [3, 1, 1]),
+    ([1, 2, 3], 6, [1, 2, 3]),
+    # Fewer days than subjects: the heaviest subjects get one day each
+    ([1, 3, 2], 2, [0, 1, 1]),
+    ([5, 5, 5], 0, [0, 0, 0]),
+])
+def test_largest_remainder_ties(weights, days, expected):
+    assert apportion_days(weights, days)[0].tolist() == expected
+
+def test_padded_rows_get_no_days():
+    weights = [[1, 1, np.nan], [1, 2, 3]]
+    assert apportion_days(weights, [5, 6]).tolist() == [[3, 2, 0], [1, 2, 3]]
+
+def test_rows_sum_to_their_days_and_match_the_reference():
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        count = rng.integers(1, 8)
+        weights = rng.choice([0.5, 1.0, 1.5, 2.0, 3.0, 4.5, 7.5], size=count).tolist()
+        days = int(rng.integers(0, 40))
+        allocation = apportion_days(weights, days)[0].tolist()
+        assert sum(allocation) == days
+        assert allocation == _reference(weights, days)
+
+def test_study_distribution_is_keyed_by_subject():
+    distribution = calculate_study_distribution(["Math", "Art"], 7, {"Math": 5, "Art": 1}, {"Math": "High"})
+    assert distribution == {"Math": 6, "Art": 1}
+    assert calculate_study_distribution([], 7) == {}
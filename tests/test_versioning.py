@@ -0,0 +1,53 @@
+import sqlite3
+
+from sqlite_database import SCHEMA, SQLiteDatabase
+
+def test_update_plan_rejects_a_stale_version(db, make_plan):
+    plan = make_plan()
+    db.add_plans([plan])
+    version = db.get_plan(plan.id).version or 0
+
+    assert db.update_plan(plan.id, plan, expected_version=version)
+    assert not db.update_plan(plan.id, plan, expected_version=version)
+    assert db.get_plan(plan.id).version == version + 1
+
+def test_stale_progress_updates_are_merged(db, make_plan):
+    plan = make_plan()
+    db.add_plans([plan])
+    first = db.get_progress(plan.id)
+    second = db.get_progress(plan.id)
+
+    saved = db.update_progress(plan.id, dict(first, completed_tasks=[0, 1]))
+    merged = db.update_progress(plan.id, dict(second, completed_tasks=[2]))
+
+    assert saved["version"] == first["version"] + 1
+    assert merged["completed_tasks"] == [0, 1, 2]
+    assert merged["version"] == saved["version"] + 1
+
+def test_toggles_bump_the_progress_version(db, make_plan):
+    plan = make_plan()
+    db.add_plans([plan])
+    version = db.get_progress(plan.id)["version"]
+
+    db.toggle(plan.id, 0, True)
+
+    assert db.get_progress(plan.id)["version"] == version + 1
+
+def test_sqlite_adds_version_columns_to_old_databases(tmp_path):
+    path = str(tmp_path / "store.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        SCHEMA.replace("    version INTEGER,\n", "").replace(",\n    version INTEGER NOT NULL DEFAULT 0", "")
+    )
+    conn.execute("INSERT INTO plans (id, type, extra) VALUES ('p1', 'Exam Time', '{\"version\": 3}')")
+    conn.execute("INSERT INTO progress (plan_id, total_tasks) VALUES ('p1', 0)")
+    conn.commit()
+    conn.close()
+
+    db = SQLiteDatabase(path)
+    try:
+        assert db.get_plan("p1").version == 3
+        assert db.get_progress("p1")["version"] == 0
+        assert db.update_plan("p1", db.get_plan("p1"), expected_version=3)
+    finally:
+        db.close()
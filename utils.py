@@ -3,6 +3,8 @@
 import random
 from datetime import datetime, timedelta
 
+import numpy as np
+
 def format_time(time_obj):
     """Format time object to string"""
     if isinstance(time_obj, str):
@@ -94,6 +96,66 @@ def validate_input(input_text, input_type):
         # Default validation (non-empty)
         return input_text.strip() != ""
 
+# Weight multiplier for each priority level
+PRIORITY_VALUES = {"High": 1.5, "Medium": 1.0, "Low": 0.5}
+
+def study_weights(subjects, difficulty_dict=None, priority_dict=None):
+    """Difficulty x priority weight of each subject, as a NumPy vector"""
+    difficulty_dict = difficulty_dict or {}
+    priority_dict = priority_dict or {}
+    return np.array([
+        difficulty_dict.get(subject, 3) * PRIORITY_VALUES.get(priority_dict.get(subject, "Medium"), 1.0)
+        for subject in subjects
+    ], dtype=float)
+
+def apportion_days(weights, days_available):
+    """
+    Split whole days across subjects by largest-remainder apportionment, for many students at once
+    
+    Every subject gets one guaranteed day. The days left over are shared in
+    proportion to how far each subject's weighted share exceeds that one day,
+    rounding down, and the few days still left go to the largest remainders
+    (ties to the heavier, then earlier, subject). When every share is at
+    least a day this is plain largest-remainder apportionment. When a
+    student has fewer days than subjects, the heaviest subjects get one day
+    each.
+    
+    Args:
+        weights (array-like): (students, subjects) weights; pad ragged rows with NaN
+        days_available (array-like): Days per student, or one number for all
+        
+    Returns:
+        numpy.ndarray: (students, subjects) integer days; each row sums to its days_available
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    real = ~np.isnan(weights)
+    # Non-positive weights still earn their guaranteed day
+    weights = np.where(real, np.maximum(weights, 1e-9), 0.0)
+    days = np.broadcast_to(np.asarray(days_available, dtype=np.int64), weights.shape[:1])
+    
+    count = real.sum(axis=1)
+    short = days < count
+    spare = np.where(short, days, days - count)
+    
+    share = weights / weights.sum(axis=1, keepdims=True).clip(min=1e-300) * days[:, None]
+    excess = np.maximum(share - 1, 0)
+    quota = excess / excess.sum(axis=1, keepdims=True).clip(min=1e-300) * spare[:, None]
+    quota[short] = 0
+    allocation = np.floor(quota)
+    left = spare - allocation.sum(axis=1).astype(np.int64)
+    
+    # Rank subjects by remainder (by weight for short rows), padding last
+    remainder = np.where(short[:, None], weights, quota - allocation)
+    remainder[~real] = -1
+    columns = np.broadcast_to(np.arange(weights.shape[1]), weights.shape)
+    order = np.lexsort((columns, -weights, -remainder), axis=-1)
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, columns, axis=-1)
+    
+    allocation += rank < left[:, None]
+    allocation += real & ~short[:, None]
+    return allocation.astype(np.int64)
+
 def calculate_study_distribution(subjects, days_available, difficulty_dict=None, priority_dict=None):
     """
     Calculate how to distribute study time across subjects based on difficulty and priority
@@ -107,55 +169,31 @@ def calculate_study_distribution(subjects, days_available, difficulty_dict=None,
     Returns:
         dict: Dictionary mapping subjects to number of days to spend on them
     """
-    if difficulty_dict is None:
-        difficulty_dict = {subject: 3 for subject in subjects}  # Default medium difficulty
-        
-    if priority_dict is None:
-        priority_dict = {subject: "Medium" for subject in subjects}  # Default medium priority
-    
-    # Convert priority to numerical value
-    priority_values = {"High": 1.5, "Medium": 1.0,_values = {"High": 1.5, "Medium": 1.0, "Low": 0.5}
-    
-    # Calculate weighted difficulty based on priority
-    weighted_difficulties = {}
-    total_weighted_difficulty = 0
-    
-    for subject in subjects:
-        difficulty = difficulty_dict.get(subject, 3)
-        priority = priority_dict.get(subject, "Medium")
-        priority_value = priority_values.get(priority, 1.0)
-        
-        weighted_difficulty = difficulty * priority_value
-        weighted_difficulties[subject] = weighted_difficulty
-        total_weighted_difficulty += weighted_difficulty
-    
-    # Distribute days based on weighted difficulty
-    days_per_subject = {}
-    remaining_days = days_available
+    if not subjects:
+        return {}
+    allocation = apportion_days(study_weights(subjects, difficulty_dict, priority_dict), days_available)[0]
+    return dict(zip(subjects, allocation.tolist()))
+
+def calculate_study_distribution_batch(subject_lists, days_available, difficulty_dicts=None, priority_dicts=None):
+    """
+    Calculate study distributions for many students in one vectorized pass
     
-    for subject in subjects:
-        # Calculate proportion of days based on weighted difficulty
-        proportion = weighted_difficulties[subject] / total_weighted_difficulty
-        days = max(1, round(proportion * days_available))
-        
-        # Ensure we don't exceed available days
-        if days > remaining_days:
-            days = remaining_days
+    Args:
+        subject_lists (list): Subject list of each student
+        days_available (int or list): Days available, per student or shared
+        difficulty_dicts (list, optional): Difficulty ratings of each student
+        priority_dicts (list, optional): Priority levels of each student
         
-        days_per_subject[subject] = days
-        remaining_days -= days
-    
-    # Distribute any remaining days to highest priority subjects
-    sorted_subjects = sorted(
-        subjects,
-        key=lambda s: (priority_values.get(priority_dict.get(s, "Medium"), 1.0), weighted_difficulties[s]),
-        reverse=True
-    )
-    
-    i = 0
-    while remaining_days > 0 and i < len(sorted_subjects):
-        days_per_subject[sorted_subjects[i]] += 1
-        remaining_days -= 1
-        i = (i + 1) % len(sorted_subjects)
-    
-    return days_per_subject
\ No newline at end of file
+    Returns:
+        numpy.ndarray: (students, most subjects) matrix; entry [i, j] is the days for
+        subject_lists[i][j], with 0 past the end of shorter lists
+    """
+    width = max((len(subjects) for subjects in subject_lists), default=0)
+    weights = np.full((len(subject_lists), width), np.nan)
+    for i, subjects in enumerate(subject_lists):
+        weights[i, :len(subjects)] = study_weights(
+            subjects,
+            difficulty_dicts[i] if difficulty_dicts else None,
+            priority_dicts[i] if priority_dicts else None
+        )
+    return apportion_days(weights, days_available)